@@ -1,3 +1,4 @@
-from triangulateMars import triangulate
-from fitPlane import plane 
-from fitOrbit import orbit
\ No newline at end of file
+from .triangulateMars import triangulate
+from .fitPlane import plane
+from .fitOrbit import orbit
+from .profiling import profile
@@ -0,0 +1,142 @@
+""" Command line batch runner for the Mars orbit computation.
+
+	python -m mars_orbit DIRECTORY [DIRECTORY ...] [--jobs N] [--no-plots]
+
+	Each directory must contain triangulation.csv and opposition.csv. The
+	results of each directory go to OUTPUT/<directory name>/ and a summary
+	row per directory (with per-stage timings) goes to OUTPUT/summary.csv.
+	A directory that fails gets a row with its error instead, the other
+	directories still run, and the command exits with status 1.
+"""
+
+# Developed by Pulkit Singh, Niheshkumar Rathod & Rajesh Sundaresan
+# Copyright lies with the Robert Bosch Center for Cyber-Physical Systems,
+# Indian Institute of Science, Bangalore, India.
+
+#----------------------------------------------------------------------------#
+
+import argparse
+import multiprocessing
+import os
+import sys
+
+#----------------------------------------------------------------------------#
+
+def parseArguments(argv):
+	""" Parses the command line arguments. """
+
+	parser = argparse.ArgumentParser(prog="python -m mars_orbit",
+		description="Runs the triangulation, plane and orbit fits on one "
+		"or more directories of observations.")
+	parser.add_argument("directories", nargs="+", metavar="DIRECTORY",
+		help="directory containing triangulation.csv and opposition.csv")
+	parser.add_argument("-o", "--output", default="results",
+		help="directory to write results to (default: results)")
+	parser.add_argument("-j", "--jobs", type=int, default=1,
+		help="number of directories to process in parallel (default: 1)")
+	parser.add_argument("--no-plots", dest="plots", action="store_false",
+		help="do not show any plots (headless mode)")
+	parser.add_argument("--compiled", action="store_true",
+		help="use the compiled gradient descent kernels")
+	parser.add_argument("--eccentric-earth", dest="eccentricEarth",
+		action="store_true",
+		help="place Earth on its elliptical orbit instead of a circle")
+	parser.add_argument("--profile", action="store_true",
+		help="write a per-function profile of each directory")
+	parser.add_argument("--profile-memory", dest="profileMemory",
+		action="store_true",
+		help="also trace the peak memory of each function, in a second "
+		"run of each directory (implies --profile)")
+
+	args = parser.parse_args(argv)
+	if args.jobs < 1:
+		parser.error("--jobs must be at least 1")
+	if args.plots and args.jobs > 1:
+		parser.error("plots can only be shown with --jobs 1, "
+			"use --no-plots for parallel runs")
+	return args
+
+#----------------------------------------------------------------------------#
+
+def outputDirectories(directories, output):
+	""" Picks an output directory for each input directory, named after it
+		and made unique when two inputs have the same name.
+	"""
+
+	names = []
+	for directory in directories:
+		name = os.path.basename(os.path.normpath(os.path.abspath(directory)))
+		unique, count = name, 1
+		while unique in names:
+			count += 1
+			unique = name + "_" + str(count)
+		names.append(unique)
+	return [os.path.join(output, name) for name in names]
+
+#----------------------------------------------------------------------------#
+
+def main(argv=None):
+	""" Runs the pipeline on every directory given on the command line. """
+
+	args = parseArguments(argv)
+
+	# headless runs must not need a display
+	if not args.plots:
+		import matplotlib
+		matplotlib.use("Agg")
+
+	from mars_orbit import pipeline, kernels
+
+	tasks = []
+	for directory, outputDirectory in zip(args.directories,
+		outputDirectories(args.directories, args.output)):
+		tasks.append((directory, outputDirectory, args.plots, args.compiled,
+			args.eccentricEarth, args.profile or args.profileMemory,
+			args.profileMemory))
+
+	if args.jobs == 1:
+		summaries = [pipeline.runDirectory(task) for task in tasks]
+	else:
+		initializer = kernels.warmUp if args.compiled else None
+		pool = multiprocessing.Pool(args.jobs, initializer)
+		try:
+			summaries = pool.map(pipeline.runDirectory, tasks)
+		finally:
+			pool.close()
+			pool.join()
+
+	# failed directories only have the directory and error columns, so the
+	# columns are collected from every summary and missing values left empty
+	fields = []
+	for summary in summaries:
+		for column, value in summary:
+			if column not in fields:
+				fields.append(column)
+	if "error" in fields:
+		fields.remove("error")
+		fields.append("error")
+	rows = [[dict(summary).get(column, "") for column in fields]
+		for summary in summaries]
+
+	if not os.path.isdir(args.output):
+		os.makedirs(args.output)
+	pipeline.writeTable(os.path.join(args.output, "summary.csv"), fields, rows)
+
+	failed = 0
+	for summary in summaries:
+		line = " ".join(column + "=" + str(value) for column, value in summary)
+		if "error" in dict(summary):
+			failed += 1
+			sys.stderr.write(line + "\n")
+		else:
+			print(line)
+	if failed:
+		sys.stderr.write("%d of %d directories failed\n" % (failed,
+			len(summaries)))
+		return 1
+	return 0
+
+#----------------------------------------------------------------------------#
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,576 @@
+""" This module checks the fast paths of the package against the original
+	loop based implementations, on the shipped data files and on generated
+	datasets, and reports how much faster each fast path is.
+
+	python -m mars_orbit.accuracy [--data DIRECTORY] [--sizes 12 100 20000]
+
+	Every fast path must agree with its reference within the tolerance of
+	its kind (see TOLERANCES); the command exits with status 1 otherwise.
+	A check that raises (e.g. a reference that diverges on a large
+	dataset) fails with its error, and the other checks still run.
+"""
+
+# Developed by Pulkit Singh, Niheshkumar Rathod & Rajesh Sundaresan
+# Copyright lies with the Robert Bosch Center for Cyber-Physical Systems,
+# Indian Institute of Science, Bangalore, India.
+
+#----------------------------------------------------------------------------#
+
+import argparse
+import json
+import math
+import os
+import sys
+import timeit
+import numpy as np
+
+from .triangulateMars import triangulate
+from .fitPlane import plane
+from .fitOrbit import orbit
+from .fitOrbit import oppositionIndex
+from . import kepler, kernels, precision
+
+ellipseGradientDescent = orbit.ellipseGradientDescent
+planeGradientDescent = plane.planeGradientDescent
+
+# largest acceptable error, relative to the largest reference value.
+# float64 paths only differ from the references in rounding; float32 paths
+# lose about 7 digits, which the float64 refinement of the fits recovers.
+# Oppositions are interpolated between daily positions.
+TOLERANCES = {
+	"float64": 1e-9,
+	"float32": 1e-4,
+	"float32 refined": 1e-6,
+	"interpolated": 1e-6,
+}
+
+#----------------------------------------------------------------------------#
+
+def timed(function, *args):
+	""" Calls function(*args), returns its result and the seconds taken. """
+
+	start = timeit.default_timer()
+	result = function(*args)
+	return result, timeit.default_timer() - start
+
+def compare(name, dataset, kind, fast, reference, fastSeconds,
+	referenceSeconds):
+	""" Compares a fast result with its reference.
+
+	Parameters:
+		name (str): name of the fast path
+		dataset (str): name of the dataset
+		kind (str): key of TOLERANCES for the fast path
+		fast (float array): result of the fast path
+		reference (float array): result of the reference
+		fastSeconds (float): time taken by the fast path
+		referenceSeconds (float): time taken by the reference
+
+	Returns:
+		check (dict): the errors, tolerance, speedup and whether the check
+					passed
+
+	"""
+
+	fast = np.asarray(fast, dtype=np.float64)
+	reference = np.asarray(reference, dtype=np.float64)
+	absError = float(np.max(np.abs(fast - reference)))
+	relError = absError / max(float(np.max(np.abs(reference))),
+		np.finfo(float).tiny)
+
+	return {
+		"name": name,
+		"dataset": dataset,
+		"kind": kind,
+		"maxAbsError": absError,
+		"relError": relError,
+		"tolerance": TOLERANCES[kind],
+		"speedup": referenceSeconds / max(fastSeconds, 1e-9),
+		"passed": bool(relError <= TOLERANCES[kind]),
+		"error": None,
+	}
+
+def failure(name, dataset, error):
+	""" Records a check that raised instead of returning a result, e.g. a
+		reference gradient descent that diverges on a large dataset.
+
+	Returns:
+		check (dict): same keys as compare(), with no errors, tolerance or
+					speedup, passed False and the exception in error
+
+	"""
+
+	return {
+		"name": name,
+		"dataset": dataset,
+		"kind": None,
+		"maxAbsError": None,
+		"relError": None,
+		"tolerance": None,
+		"speedup": None,
+		"passed": False,
+		"error": "%s: %s" % (type(error).__name__, error),
+	}
+
+def runCheck(check, name, *args):
+	""" Calls check(*args, name), turning an exception into a failure. """
+
+	try:
+		return check(*(args + (name,)))
+	except Exception as error:
+		return [failure(check.__name__, name, error)]
+
+#----------------------------------------------------------------------------#
+
+def shippedDataset(directory):
+	""" Builds the inputs of every check from triangulation.csv and
+		opposition.csv, using the reference functions.
+
+	Parameters:
+		directory (str): directory containing the two data files
+
+	Returns:
+		dataset (dict): paired Earth locations and Mars angles, celestial
+					sphere latitudes, longitudes and coordinates, and
+					lifted Mars locations
+
+	"""
+
+	earthLocations, marsAngles = triangulate.loadData(
+		os.path.join(directory, "triangulation.csv"))
+	pairs = len(earthLocations) // 2
+	earth1, angles1 = earthLocations[0::2][:pairs], marsAngles[0::2][:pairs]
+	earth2, angles2 = earthLocations[1::2][:pairs], marsAngles[1::2][:pairs]
+	marsLocations = [triangulate.findMars(earth1[i], angles1[i], earth2[i],
+		angles2[i]) for i in range(pairs)]
+
+	helioLong, geoLat = plane.loadData(os.path.join(directory,
+		"opposition.csv"))
+	helioLat = plane.findHelioLat(triangulate.computeRadius(marsLocations),
+		geoLat)
+	coordinates = plane.findCoordinates(helioLong, helioLat)
+
+	planeParameters = planeGradientDescent.findPlane(coordinates)
+	liftedLocations = orbit.liftCoordinates(planeParameters, marsLocations)
+
+	return {
+		"pairs": (earth1, angles1, earth2, angles2),
+		"angles": (helioLong, helioLat),
+		"coordinates": coordinates,
+		"liftedLocations": liftedLocations,
+	}
+
+def generatedDataset(count, seed=0):
+	""" Generates observations of a Mars-like orbit with a little noise.
+
+	Parameters:
+		count (int): number of Mars locations
+		seed (int): seed of the random number generator
+
+	Returns:
+		dataset (dict): same layout as shippedDataset
+
+	"""
+
+	random = np.random.RandomState(seed)
+
+	# Mars on an ellipse with the sun at a focus, on a slightly tilted plane
+	axis, eccentricity, perihelion = 3.05, 0.093, math.radians(336.0)
+	trueAnomaly = random.uniform(0, 2 * math.pi, count)
+	distance = ((axis / 2) * (1 - eccentricity ** 2)
+		/ (1 + eccentricity * np.cos(trueAnomaly)))
+	longitude = trueAnomaly + perihelion
+	xMars = distance * np.cos(longitude) + random.normal(0, 0.002, count)
+	yMars = distance * np.sin(longitude) + random.normal(0, 0.002, count)
+	zMars = 0.03 * xMars - 0.02 * yMars
+
+	# two sightings of each location, from Earth a few months apart
+	earthLong1 = longitude + random.uniform(-0.6, -0.3, count)
+	earthLong2 = longitude + random.uniform(0.3, 0.6, count)
+	earth1 = np.column_stack([np.cos(earthLong1), np.sin(earthLong1)])
+	earth2 = np.column_stack([np.cos(earthLong2), np.sin(earthLong2)])
+	angles1 = np.arctan2(yMars - earth1[:, 1], xMars - earth1[:, 0])
+	angles2 = np.arctan2(yMars - earth2[:, 1], xMars - earth2[:, 0])
+
+	# directions of Mars on the celestial sphere
+	norm = np.sqrt(xMars ** 2 + yMars ** 2 + zMars ** 2)
+	helioLat = np.arcsin(zMars / norm)
+	helioLong = np.arctan2(yMars, xMars)
+
+	return {
+		"pairs": (earth1.tolist(), angles1.tolist(), earth2.tolist(),
+			angles2.tolist()),
+		"angles": (helioLong.tolist(), helioLat.tolist()),
+		"coordinates": plane.findCoordinates(helioLong.tolist(),
+			helioLat.tolist()),
+		"liftedLocations": np.column_stack([xMars, yMars, zMars]).tolist(),
+	}
+
+#----------------------------------------------------------------------------#
+
+def checkTriangulation(dataset, name):
+	""" Checks precision.findMars and precision.findCoordinates against
+		triangulate.findMars and plane.findCoordinates.
+	"""
+
+	earth1, angles1, earth2, angles2 = dataset["pairs"]
+	reference, referenceSeconds = timed(lambda: [triangulate.findMars(
+		earth1[i], angles1[i], earth2[i], angles2[i])
+		for i in range(len(earth1))])
+
+	checks = []
+	for dtype, kind in [(np.float64, "float64"), (np.float32, "float32")]:
+		fast, fastSeconds = timed(precision.findMars, earth1, angles1, earth2,
+			angles2, dtype)
+		checks.append(compare("precision.findMars (%s)" % kind, name, kind,
+			fast, reference, fastSeconds, referenceSeconds))
+
+	helioLong, helioLat = dataset["angles"]
+	reference, referenceSeconds = timed(plane.findCoordinates, helioLong,
+		helioLat)
+	for dtype, kind in [(np.float64, "float64"), (np.float32, "float32")]:
+		fast, fastSeconds = timed(precision.findCoordinates, helioLong,
+			helioLat, dtype)
+		checks.append(compare("precision.findCoordinates (%s)" % kind, name,
+			kind, fast, reference, fastSeconds, referenceSeconds))
+	return checks
+
+def checkCircle(dataset, name):
+	""" Checks precision.fitCircle against orbit.fitCircle. """
+
+	liftedLocations = dataset["liftedLocations"]
+	reference, referenceSeconds = timed(orbit.fitCircle, liftedLocations)
+
+	checks = []
+	for dtype, kind in [(np.float64, "float64"), (np.float32, "float32")]:
+		fast, fastSeconds = timed(precision.fitCircle, liftedLocations, dtype)
+		checks.append(compare("precision.fitCircle (%s)" % kind, name, kind,
+			fast, reference, fastSeconds, referenceSeconds))
+	return checks
+
+def checkPlane(dataset, name):
+	""" Checks the compiled, batched and reduced precision plane fits,
+		and the NumPy fallbacks of the kernels, against
+		planeGradientDescent.findPlane.
+	"""
+
+	coordinates = dataset["coordinates"]
+	reference, referenceSeconds = timed(planeGradientDescent.findPlane,
+		coordinates)
+
+	checks = []
+	fast, fastSeconds = timed(planeGradientDescent.findPlaneCompiled,
+		coordinates)
+	checks.append(compare("planeGradientDescent.findPlaneCompiled", name,
+		"float64", fast, reference, fastSeconds, referenceSeconds))
+
+	batch = np.array([np.array(coordinates).T] * 4)
+	fast, fastSeconds = timed(kernels.planeDescentBatch, batch, 0.0, 0.0,
+		0.0001, 10000)
+	checks.append(compare("kernels.planeDescentBatch (x4)", name, "float64",
+		fast[0], reference, fastSeconds / 4, referenceSeconds))
+
+	# the NumPy fallbacks, which only run when numba is not installed
+	fast, fastSeconds = timed(kernels._planeDescentNumpy,
+		np.array(coordinates).T, 0.0, 0.0, 0.0001, 10000)
+	checks.append(compare("kernels._planeDescentNumpy", name, "float64",
+		fast[:2], reference, fastSeconds, referenceSeconds))
+
+	fast, fastSeconds = timed(kernels._planeBatchNumpy, batch, 0.0, 0.0,
+		0.0001, 10000)
+	checks.append(compare("kernels._planeBatchNumpy (x4)", name, "float64",
+		fast[0][0], reference, fastSeconds / 4, referenceSeconds))
+
+	fast, fastSeconds = timed(precision.fitPlane, coordinates)
+	checks.append(compare("precision.fitPlane (float32)", name,
+		"float32 refined", fast[0], reference, fastSeconds,
+		referenceSeconds))
+	return checks
+
+def checkEllipse(dataset, name):
+	""" Checks the compiled, batched and reduced precision ellipse fits,
+		and the NumPy fallbacks of the kernels, against
+		ellipseGradientDescent.findEllipse.
+	"""
+
+	liftedLocations = np.array(dataset["liftedLocations"])
+	xMars = liftedLocations[:, 0].tolist()
+	yMars = liftedLocations[:, 1].tolist()
+	reference, referenceSeconds = timed(ellipseGradientDescent.findEllipse,
+		xMars, yMars, 0.0, 0.0, 0.0)
+	reference = reference[:3]
+
+	checks = []
+	fast, fastSeconds = timed(ellipseGradientDescent.findEllipseCompiled,
+		xMars, yMars, 0.0, 0.0, 0.0)
+	checks.append(compare("ellipseGradientDescent.findEllipseCompiled", name,
+		"float64", fast[:3], reference, fastSeconds, referenceSeconds))
+
+	fast, fastSeconds = timed(kernels.ellipseDescentBatch, [xMars] * 4,
+		[yMars] * 4, 0.0, 0.0, 0.0, 0.001, 10000)
+	checks.append(compare("kernels.ellipseDescentBatch (x4)", name,
+		"float64", fast[0][0], reference, fastSeconds / 4,
+		referenceSeconds))
+
+	# the NumPy fallbacks, which only run when numba is not installed
+	fast, fastSeconds = timed(kernels._ellipseDescentNumpy,
+		liftedLocations[:, 0].copy(), liftedLocations[:, 1].copy(), 0.0, 0.0,
+		0.0, 0.001, 10000)
+	checks.append(compare("kernels._ellipseDescentNumpy", name, "float64",
+		fast[:3], reference, fastSeconds, referenceSeconds))
+
+	fast, fastSeconds = timed(kernels._ellipseBatchNumpy,
+		np.array([xMars] * 4), np.array([yMars] * 4), 0.0, 0.0, 0.0, 0.001,
+		10000)
+	checks.append(compare("kernels._ellipseBatchNumpy (x4)", name,
+		"float64", fast[0][0], reference, fastSeconds / 4,
+		referenceSeconds))
+
+	fast, fastSeconds = timed(precision.fitEllipse, liftedLocations)
+	checks.append(compare("precision.fitEllipse (float32)", name,
+		"float32 refined", fast[0], reference, fastSeconds,
+		referenceSeconds))
+	return checks
+
+def checkScaledFits(dataset, name):
+	""" Checks precision.fitPlane and precision.fitEllipse on datasets too
+		large for the original step sizes (and too slow for the loop
+		based references). The reference is the float64 kernel with the
+		same scaled step, which checkPlane and checkEllipse compare with
+		the loop based fits on small datasets. The error report of each
+		fit, on its float64 sample, is checked as well.
+	"""
+
+	checks = []
+	coordinateMatrix = np.ascontiguousarray(np.array(dataset["coordinates"]).T)
+	alpha = kernels.stepSize(kernels.PLANE_ALPHA, kernels.PLANE_POINTS,
+		len(coordinateMatrix))
+	reference, referenceSeconds = timed(kernels.planeDescent,
+		coordinateMatrix, 0.0, 0.0, alpha, kernels.ITERATIONS)
+	(fast, planeReport), fastSeconds = timed(precision.fitPlane,
+		dataset["coordinates"])
+	checks.append(compare("precision.fitPlane (float32)", name,
+		"float32 refined", fast, reference[:2], fastSeconds,
+		referenceSeconds))
+	checks.append(compare("precision.fitPlane report", name,
+		"float32 refined", planeReport["fast"], planeReport["reference"],
+		fastSeconds, referenceSeconds))
+
+	liftedLocations = np.array(dataset["liftedLocations"])
+	alpha = kernels.stepSize(kernels.ELLIPSE_ALPHA, kernels.ELLIPSE_POINTS,
+		len(liftedLocations))
+	reference, referenceSeconds = timed(kernels.ellipseDescent,
+		liftedLocations[:, 0], liftedLocations[:, 1], 0.0, 0.0, 0.0, alpha,
+		kernels.ITERATIONS)
+	(fast, loss, ellipseReport), fastSeconds = timed(precision.fitEllipse,
+		liftedLocations)
+	checks.append(compare("precision.fitEllipse (float32)", name,
+		"float32 refined", fast, reference[:3], fastSeconds,
+		referenceSeconds))
+	checks.append(compare("precision.fitEllipse report", name,
+		"float32 refined", ellipseReport["fast"], ellipseReport["reference"],
+		fastSeconds, referenceSeconds))
+	return checks
+
+def checkSexagesimal(name, count=kernels.PARALLEL_THRESHOLD, seed=0):
+	""" Checks kernels.sexagesimalToRadians and its NumPy fallback against
+		the math.radians conversion of the original data loaders. The
+		default count is large enough for the parallel kernel.
+	"""
+
+	random = np.random.RandomState(seed)
+	degrees = random.randint(0, 360, count).astype(np.float64)
+	minutes = random.randint(0, 60, count).astype(np.float64)
+	seconds = random.randint(0, 60, count).astype(np.float64)
+
+	reference, referenceSeconds = timed(lambda: [math.radians(degrees[i]
+		+ (minutes[i] / 60) + (seconds[i] / 3600)) for i in range(count)])
+
+	checks = []
+	fast, fastSeconds = timed(kernels.sexagesimalToRadians, degrees, minutes,
+		seconds)
+	checks.append(compare("kernels.sexagesimalToRadians", name, "float64",
+		fast, reference, fastSeconds, referenceSeconds))
+
+	fast, fastSeconds = timed(kernels._sexagesimalNumpy, degrees, minutes,
+		seconds)
+	checks.append(compare("kernels._sexagesimalNumpy", name, "float64",
+		fast, reference, fastSeconds, referenceSeconds))
+	return checks
+
+def solveKeplerLoop(meanAnomaly, eccentricity):
+	""" Reference for kepler.solveKepler: fixed point iterations of
+		E = M + e sin(E), one mean anomaly at a time.
+	"""
+
+	eccentricAnomaly = []
+	for M in meanAnomaly:
+		E = M
+		for i in range(1000):
+			previous, E = E, M + eccentricity * math.sin(E)
+			if abs(E - previous) < 1e-15:
+				break
+		eccentricAnomaly.append(E)
+	return eccentricAnomaly
+
+def findOppositionsLoop(index, start, end):
+	""" Reference for OppositionIndex.oppositions: steps through the days
+		one at a time and bisects every day on which the longitude of Mars
+		falls behind the longitude of Earth.
+	"""
+
+	def gap(day):
+		marsLong = index.positions([day])[0][0]
+		return float(kepler.wrapAngle(marsLong
+			- index.earthLongitudes([day])[0]))
+
+	# starting a day early, for an opposition right at the start
+	oppositions = []
+	day = math.floor(start) - 1.0
+	before = gap(day)
+	while day < end:
+		after = gap(day + 1)
+		if before >= 0 and after < 0 and before - after < math.pi:
+			low, high = day, day + 1
+			for i in range(60):
+				middle = (low + high) / 2
+				if gap(middle) >= 0:
+					low = middle
+				else:
+					high = middle
+			if start <= low < end:
+				oppositions.append(low)
+		day, before = day + 1, after
+	return oppositions
+
+def checkKepler(name):
+	""" Checks kepler.solveKepler against solveKeplerLoop, for the
+		eccentricities of Earth and Mars.
+	"""
+
+	meanAnomaly = np.linspace(-math.pi, math.pi, 2001)
+
+	checks = []
+	for eccentricity in [0.016709, 0.093]:
+		reference, referenceSeconds = timed(solveKeplerLoop,
+			meanAnomaly.tolist(), eccentricity)
+		fast, fastSeconds = timed(kepler.solveKepler, meanAnomaly,
+			eccentricity)
+		checks.append(compare("kepler.solveKepler (e=%g)" % eccentricity,
+			name, "float64", fast, reference, fastSeconds, referenceSeconds))
+	return checks
+
+def checkOppositions(name):
+	""" Checks the oppositions found by OppositionIndex (daily tables in
+		cached segments, with linear interpolation) against
+		findOppositionsLoop, over sixty years of a Mars-like orbit.
+	"""
+
+	index = oppositionIndex.OppositionIndex([-0.24, 0.2, 3.07],
+		[0.024, -0.022], [730000.0], [5.85], segmentDays=3653)
+	start, end = 730100.0, 730100.0 + 60 * 365.25
+
+	reference, referenceSeconds = timed(findOppositionsLoop, index, start,
+		end)
+	fast, fastSeconds = timed(lambda: index.oppositions(start, end)[0])
+	if len(fast) != len(reference):
+		return [compare("OppositionIndex.oppositions (count)", name,
+			"float64", [len(fast)], [len(reference)], fastSeconds,
+			referenceSeconds)]
+
+	# days since the start, so that the error is relative to the span
+	return [compare("OppositionIndex.oppositions", name, "interpolated",
+		np.asarray(fast) - start, np.asarray(reference) - start,
+		fastSeconds, referenceSeconds)]
+
+#----------------------------------------------------------------------------#
+
+def runChecks(directory=".", sizes=(12, 100, 20000), seed=0):
+	""" Runs every check on the shipped data (when it is found in the
+		directory) and on one generated dataset per size. Datasets of more
+		than kernels.ELLIPSE_POINTS locations, on which the loop based fits
+		diverge, get checkScaledFits instead of checkPlane and
+		checkEllipse.
+
+	Parameters:
+		directory (str): directory containing the shipped data files
+		sizes (int list): number of Mars locations of generated datasets
+		seed (int): seed of the generated datasets
+
+	Returns:
+		checks (list): one dict per check, see compare() and failure()
+
+	"""
+
+	# compiling the kernels now, so that compilation is not timed
+	kernels.warmUp()
+
+	checks = (runCheck(checkKepler, "model")
+		+ runCheck(checkOppositions, "model")
+		+ runCheck(checkSexagesimal, "model"))
+
+	datasets = []
+	if (os.path.isfile(os.path.join(directory, "triangulation.csv"))
+		and os.path.isfile(os.path.join(directory, "opposition.csv"))):
+		try:
+			datasets.append(("shipped", shippedDataset(directory)))
+		except Exception as error:
+			checks.append(failure("shippedDataset", "shipped", error))
+	for size in sizes:
+		datasets.append(("generated-%d" % size, generatedDataset(size, seed)))
+
+	# a check that raises is recorded as failed, and the others still run
+	for name, dataset in datasets:
+		fits = [checkPlane, checkEllipse]
+		if len(dataset["liftedLocations"]) > kernels.ELLIPSE_POINTS:
+			fits = [checkScaledFits]
+		for check in [checkTriangulation, checkCircle] + fits:
+			checks += runCheck(check, name, dataset)
+	return checks
+
+def report(checks, stream=None):
+	""" Prints a table of the checks. """
+
+	stream = stream or sys.stdout
+	line = "%-44s %-16s %10s %10s %9s  %s\n"
+	stream.write(line % ("fast path", "dataset", "rel error", "tolerance",
+		"speedup", "result"))
+	for check in checks:
+		if check["error"] is not None:
+			stream.write(line % (check["name"], check["dataset"], "-", "-",
+				"-", "FAIL (%s)" % check["error"]))
+			continue
+		stream.write(line % (check["name"], check["dataset"],
+			"%.2e" % check["relError"], "%.0e" % check["tolerance"],
+			"%.1fx" % check["speedup"], "ok" if check["passed"] else "FAIL"))
+
+#----------------------------------------------------------------------------#
+
+def main(argv=None):
+	""" Runs the checks from the command line. """
+
+	parser = argparse.ArgumentParser(prog="python -m mars_orbit.accuracy",
+		description="Checks the fast paths against the reference "
+		"implementations and reports their speedups.")
+	parser.add_argument("--data", default=".",
+		help="directory containing triangulation.csv and opposition.csv")
+	parser.add_argument("--sizes", type=int, nargs="*",
+		default=[12, 100, 20000],
+		help="sizes of the generated datasets (default: 12 100 20000)")
+	parser.add_argument("--seed", type=int, default=0,
+		help="seed of the generated datasets")
+	parser.add_argument("--json", help="also write the checks to this file")
+	args = parser.parse_args(argv)
+
+	checks = runChecks(args.data, args.sizes, args.seed)
+	report(checks)
+	if args.json:
+		with open(args.json, "w") as outfile:
+			json.dump(checks, outfile, indent=2)
+
+	return 0 if all(check["passed"] for check in checks) else 1
+
+#----------------------------------------------------------------------------#
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -11,6 +11,9 @@
 import numpy as np
 import math
 
+# compiled kernels, with a NumPy fallback when numba is missing
+from .. import kernels
+
 #----------------------------------------------------------------------------#
 
 def evaluateDistance(xMars, yMars, xFocus, yFocus, majorAxis):
@@ -151,3 +154,30 @@ def findEllipse(xMars, yMars, xf, yf, axis):
 	return xf, yf, axis, cost
 
 #----------------------------------------------------------------------------#
+
+def findEllipseCompiled(xMars, yMars, xf, yf, axis):
+	""" Same as findEllipse, but runs the gradient descent in a compiled
+		kernel (or vectorized NumPy when numba is not installed). The
+		results match findEllipse up to floating point rounding.
+
+	Parameters:
+		xMars  (float): list of x-coordinates of Mars locations
+		yMars  (float): list of y-coordinates of Mars locations
+		xFocus (float): x-coordinate of second focus
+		yFocus (float): y-coordinate of second focus
+		majorAxis (float): length of the major axis
+
+	Returns:
+		xf (float): x-coordinate of the found focus
+		yf (float): y-coordinate of the found focus
+		axis (float): length of the major axis
+		cost (float list): list of costs in each gradient descent	
+							iteration.
+
+	"""
+
+	xf, yf, axis, cost = kernels.ellipseDescent(xMars, yMars, xf, yf, axis,
+		kernels.ELLIPSE_ALPHA, kernels.ITERATIONS)
+	return float(xf), float(yf), float(axis), cost.tolist()
+
+#----------------------------------------------------------------------------#
@@ -0,0 +1,340 @@
+""" This module predicts the positions and oppositions of Mars from the
+	best-fit ellipse (orbit.fitEllipse) and orbital plane (plane.fitPlane).
+
+	Predictions are tabulated day by day in segments, which are cached, and
+	range queries are answered with binary searches over these tables. The
+	tables are tied to the fitted parameters, so a new fit always gets new
+	tables.
+"""
+
+# Developed by Pulkit Singh, Niheshkumar Rathod & Rajesh Sundaresan
+# Copyright lies with the Robert Bosch Center for Cyber-Physical Systems,
+# Indian Institute of Science, Bangalore, India.
+
+#----------------------------------------------------------------------------#
+
+import collections
+import datetime
+import math
+import numpy as np
+
+from .. import kepler
+
+#----------------------------------------------------------------------------#
+
+def toDay(date):
+	""" Converts a date (datetime.date or proleptic Gregorian ordinal day
+		number) to an ordinal day number.
+	"""
+
+	if isinstance(date, (datetime.date, datetime.datetime)):
+		return float(date.toordinal())
+	return float(date)
+
+def toDate(day):
+	""" Converts an ordinal day number (possibly fractional) to the date it
+		falls on.
+	"""
+
+	return datetime.date.fromordinal(int(math.floor(day)))
+
+def fitKey(ellipseParameters, planeParameters, oppositionDates, helioLong):
+	""" Hashable summary of everything the predictions depend on. """
+
+	return (tuple(float(value) for value in ellipseParameters),
+		tuple(float(value) for value in planeParameters),
+		tuple(toDay(date) for date in oppositionDates),
+		tuple(float(value) for value in helioLong))
+
+#----------------------------------------------------------------------------#
+
+class OppositionIndex(object):
+	""" Table of predicted Mars positions and oppositions, indexed by date.
+
+		Mars moves on the fitted ellipse (sun at one focus) following
+		Kepler's laws, and Earth moves on a circle of radius 1 AU. The
+		dates and longitudes of the observed oppositions fix where both
+		planets are at a given date, and how fast Mars goes around.
+
+	Parameters:
+		ellipseParameters (float list): x-y coordinates of the second
+					focus and length of the major axis, from
+					orbit.fitEllipse
+		planeParameters (float list): coefficients (a, b) of the orbital
+					plane, from plane.fitPlane
+		oppositionDates (date list): dates of the observed oppositions,
+					from plane.loadDates
+		helioLong (float list): heliocentric Mars longitudes at those
+					oppositions, from plane.loadData
+		segmentDays (int): number of days tabulated together
+		maxSegments (int): number of segments kept in the cache
+
+	"""
+
+	def __init__(self, ellipseParameters, planeParameters, oppositionDates,
+		helioLong, segmentDays=3653, maxSegments=64):
+
+		self.segmentDays = int(segmentDays)
+		self.maxSegments = maxSegments
+		self._segments = collections.OrderedDict()
+		self.key = None
+		self.update(ellipseParameters, planeParameters, oppositionDates,
+			helioLong)
+
+	#------------------------------------------------------------------------#
+
+	def update(self, ellipseParameters, planeParameters, oppositionDates,
+		helioLong):
+		""" Sets the fitted parameters. The cached tables are dropped if
+			anything changed, and kept otherwise.
+		"""
+
+		if len(oppositionDates) == 0:
+			raise ValueError("at least one opposition date is needed")
+		if len(oppositionDates) != len(helioLong):
+			raise ValueError("%d opposition dates but %d longitudes"
+				% (len(oppositionDates), len(helioLong)))
+		xf, yf, axis = ellipseParameters
+		if not axis > math.sqrt(xf ** 2 + yf ** 2):
+			raise ValueError("the major axis must be longer than the "
+				"distance between the foci")
+
+		key = fitKey(ellipseParameters, planeParameters, oppositionDates,
+			helioLong)
+		if key == self.key:
+			return
+		self.key = key
+		self._segments.clear()
+
+		# orbital elements of Mars from the fitted ellipse
+		self.semiMajorAxis = axis / 2.0
+		self.eccentricity = math.sqrt(xf ** 2 + yf ** 2) / axis
+		self.perihelion = math.atan2(-yf, -xf)   # longitude of perihelion
+		self.planeParameters = [float(value) for value in planeParameters]
+		self.earthMotion = 2 * math.pi / kepler.SIDEREAL_YEAR
+
+		# at an opposition, Earth and Mars share their heliocentric
+		# longitude, which places both planets at that date
+		days = np.array(key[2])
+		helioLong = np.array(helioLong, dtype=np.float64)
+		self.epoch = days[0]
+		elapsed = days - self.epoch
+		self.earthEpochLong = kepler.circularMean(helioLong
+			- self.earthMotion * elapsed)
+
+		# Kepler's third law gives the mean motion of Mars, but small errors
+		# in the major axis add up over many orbits. The mean anomalies at
+		# the oppositions are unwrapped with it, and the motion and epoch
+		# anomaly are then fitted to them by least squares.
+		motion = 2 * math.pi / kepler.period(self.semiMajorAxis)
+		meanAnomaly = kepler.meanFromTrue(helioLong - self.perihelion,
+			self.eccentricity)
+		epochAnomaly = kepler.circularMean(meanAnomaly - motion * elapsed)
+		predicted = epochAnomaly + motion * elapsed
+		meanAnomaly = meanAnomaly + 2 * np.pi * np.round((predicted
+			- meanAnomaly) / (2 * np.pi))
+		if len(days) > 1 and elapsed[-1] > elapsed[0]:
+			motion, epochAnomaly = np.polyfit(elapsed, meanAnomaly, 1)
+		self.marsMotion = float(motion)
+		self.marsEpochAnomaly = float(epochAnomaly)
+
+	#------------------------------------------------------------------------#
+
+	def positions(self, days):
+		""" Predicts Mars positions at the given ordinal days.
+
+		Parameters:
+			days (float array): ordinal day numbers
+
+		Returns:
+			helioLong (float array): heliocentric longitudes of Mars
+			locations (float array): n x 3 x-y-z coordinates of Mars (AU)
+
+		"""
+
+		days = np.asarray(days, dtype=np.float64)
+		meanAnomaly = (self.marsEpochAnomaly
+			+ self.marsMotion * (days - self.epoch))
+		trueAnomaly = kepler.trueFromMean(kepler.wrapAngle(meanAnomaly),
+			self.eccentricity)
+		distance = kepler.radius(trueAnomaly, self.semiMajorAxis,
+			self.eccentricity)
+
+		helioLong = np.mod(trueAnomaly + self.perihelion, 2 * np.pi)
+		a, b = self.planeParameters
+		xMars = distance * np.cos(helioLong)
+		yMars = distance * np.sin(helioLong)
+		zMars = (-1 * a * xMars) + (-1 * b * yMars)
+		return helioLong, np.column_stack([xMars, yMars, zMars])
+
+	def earthLongitudes(self, days):
+		""" Predicts heliocentric Earth longitudes at the given ordinal
+			days.
+		"""
+
+		days = np.asarray(days, dtype=np.float64)
+		return np.mod(self.earthEpochLong
+			+ self.earthMotion * (days - self.epoch), 2 * np.pi)
+
+	#------------------------------------------------------------------------#
+
+	def _segment(self, number):
+		# returns the (cached) table of one segment of days
+		if number in self._segments:
+			self._segments[number] = self._segments.pop(number)
+			return self._segments[number]
+
+		first = number * self.segmentDays
+		days = np.arange(first, first + self.segmentDays + 1, dtype=np.float64)
+		helioLong, locations = self.positions(days)
+
+		# Mars is at opposition when Earth overtakes it, i.e. when the
+		# longitude difference crosses zero going down. Jumps of about 2 pi
+		# are conjunctions seen through the wrap around and are skipped.
+		gap = kepler.wrapAngle(helioLong - self.earthLongitudes(days))
+		crossing = np.nonzero((gap[:-1] >= 0) & (gap[1:] < 0)
+			& (gap[:-1] - gap[1:] < np.pi))[0]
+		fraction = gap[crossing] / (gap[crossing] - gap[crossing + 1])
+		oppositionDays = days[crossing] + fraction
+		oppositionLong, oppositionLocations = self.positions(oppositionDays)
+
+		segment = {
+			"days": days[:-1],
+			"helioLong": helioLong[:-1],
+			"locations": locations[:-1],
+			"oppositionDays": oppositionDays,
+			"oppositionLong": oppositionLong,
+			"oppositionLocations": oppositionLocations,
+		}
+		self._segments[number] = segment
+		while len(self._segments) > self.maxSegments:
+			self._segments.popitem(last=False)
+		return segment
+
+	def _query(self, start, end, daysName, names):
+		# collects the rows of [start, end) from the segments covering it
+		start, end = toDay(start), toDay(end)
+		end = max(start, end)
+		columns = dict((name, []) for name in [daysName] + names)
+		first = int(math.floor(start / self.segmentDays))
+		last = max(first, int(math.ceil(end / self.segmentDays)) - 1)
+
+		for number in range(first, last + 1):
+			segment = self._segment(number)
+			days = segment[daysName]
+			low, high = 0, len(days)
+			if number == first:
+				low = np.searchsorted(days, start, "left")
+			if number == last:
+				high = np.searchsorted(days, end, "left")
+			for name in columns:
+				columns[name].append(segment[name][low:high])
+
+		return [np.concatenate(columns[name]) for name in [daysName] + names]
+
+	#------------------------------------------------------------------------#
+
+	def oppositions(self, start, end):
+		""" Predicted oppositions between two dates.
+
+		Parameters:
+			start (date or float): first date (included)
+			end (date or float): last date (excluded)
+
+		Returns:
+			days (float array): ordinal days of the oppositions (fractional,
+						convert with toDate)
+			helioLong (float array): heliocentric longitudes of Mars
+			locations (float array): n x 3 x-y-z coordinates of Mars (AU)
+
+		"""
+
+		return self._query(start, end, "oppositionDays",
+			["oppositionLong", "oppositionLocations"])
+
+	def nextOppositions(self, date, count=1):
+		""" The first count predicted oppositions on or after a date,
+			returned as in oppositions().
+
+			Oppositions come once per synodic period (the time Earth takes
+			to gain a full turn on Mars), so the search stops after count + 1
+			synodic periods and raises ValueError if it found too few, e.g.
+			for a fit where Mars goes around as fast as Earth.
+		"""
+
+		relativeMotion = abs(self.earthMotion - self.marsMotion)
+		if relativeMotion < 1e-12:
+			raise ValueError("Mars moves as fast as Earth in this fit, it "
+				"is never at opposition")
+
+		start = toDay(date)
+		limit = start + (count + 1) * 2 * math.pi / relativeMotion
+		found = [[], [], []]
+		chunkStart = start
+		while chunkStart < limit:
+			# one segment at a time, so that no segment is tabulated twice
+			chunkEnd = min((math.floor(chunkStart / self.segmentDays) + 1)
+				* self.segmentDays, limit)
+			for columns, values in zip(found,
+				self.oppositions(chunkStart, chunkEnd)):
+				columns.append(values)
+			if sum(len(days) for days in found[0]) >= count:
+				days, helioLong, locations = [np.concatenate(columns)
+					for columns in found]
+				return days[:count], helioLong[:count], locations[:count]
+			chunkStart = chunkEnd
+
+		raise ValueError("fewer than %d oppositions within %d days of %s"
+			% (count, int(limit - start), toDate(start)))
+
+	def table(self, start, end):
+		""" Predicted daily positions of Mars between two dates.
+
+		Parameters:
+			start (date or float): first date (included)
+			end (date or float): last date (excluded)
+
+		Returns:
+			days (float array): ordinal days
+			helioLong (float array): heliocentric longitudes of Mars
+			locations (float array): n x 3 x-y-z coordinates of Mars (AU)
+
+		"""
+
+		return self._query(start, end, "days", ["helioLong", "locations"])
+
+#----------------------------------------------------------------------------#
+
+# indexes of the most recent fits, by fitted parameters
+_indexes = collections.OrderedDict()
+
+def getIndex(ellipseParameters, planeParameters, oppositionDates, helioLong):
+	""" Returns the OppositionIndex for a fit, reusing the cached one (and
+		its tables) when the same fit was seen before. A changed fit gets a
+		new index.
+
+	Parameters:
+		ellipseParameters (float list): parameters from orbit.fitEllipse
+		planeParameters (float list): parameters from plane.fitPlane
+		oppositionDates (date list): dates from plane.loadDates
+		helioLong (float list): longitudes from plane.loadData
+
+	Returns:
+		index (OppositionIndex): prediction index for the fit
+
+	"""
+
+	key = fitKey(ellipseParameters, planeParameters, oppositionDates,
+		helioLong)
+	if key in _indexes:
+		_indexes[key] = _indexes.pop(key)
+		return _indexes[key]
+
+	index = OppositionIndex(ellipseParameters, planeParameters,
+		oppositionDates, helioLong)
+	_indexes[key] = index
+	while len(_indexes) > 4:
+		_indexes.popitem(last=False)
+	return index
+
+#----------------------------------------------------------------------------#
@@ -17,7 +17,7 @@ from mpl_toolkits.mplot3d import Axes3D
 from matplotlib.patches import Ellipse
 
 # importing custom module to run gradient descent on elliptical mars orbit
-import ellipseGradientDescent 
+from . import ellipseGradientDescent
 
 #----------------------------------------------------------------------------#
 
@@ -84,12 +84,13 @@ def fitCircle(liftedLocations):
 
 #----------------------------------------------------------------------------#
 
-def fitEllipse(liftedLocations):
+def fitEllipse(liftedLocations, compiled=False):
 	""" Fits an ellipse for the orbit of Mars.
 
 	Parameters:
 		liftedLocations (float list): x-y-z coordinates of Mars on its 
 					orbital plane
+		compiled (bool): use the compiled gradient descent kernel
 
 	Returns:
 		ellipseParameters (float list): x-y coordinates of second focus,
@@ -107,8 +108,11 @@ def fitEllipse(liftedLocations):
 	xf1, yf1, axis1 = 0.0, 0.0, 0.0
 
 	# finding the best fit ellipse
-	xf, yf, axis, cost = ellipseGradientDescent.findEllipse(xMars, yMars, 
-		xf1, yf1, axis1)
+	if compiled:
+		findEllipse = ellipseGradientDescent.findEllipseCompiled
+	else:
+		findEllipse = ellipseGradientDescent.findEllipse
+	xf, yf, axis, cost = findEllipse(xMars, yMars, xf1, yf1, axis1)
 
 	ellipseParameters = [xf, yf, axis]  # making parameter list
 	loss = cost[-1]                     # storing only the final cost
@@ -9,52 +9,77 @@
 #----------------------------------------------------------------------------#
 
 import csv
+import datetime
 import math
 import numpy as np
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
 
 # importing custom module to run gradient descent on mars orbital plane
-import planeGradientDescent
+from . import planeGradientDescent
+
+# compiled kernels, with a NumPy fallback when numba is missing
+from .. import kernels
 
 #----------------------------------------------------------------------------#
 
-def loadData():
+def loadData(opp="opposition.csv"):
 	""" Loads data contained in opposition.csv, returns lists of heliocentric
 		Mars longitudes and geocentric Mars latitudes.
 
 	Parameters:
-		none
+		opp (str): path to the opposition csv file
 
 	Returns:
 		helioLong (float list): list of heliocentric Mars longitudes
 		geoLat (float list): list of geocentric Mars latitudes
 
 	"""
-	opp = "opposition.csv"
 	fields = []        # text headings in csv file
-	helioLong = []     # heliocentric longitude of Mars (in radians)
-	geoLat = []        # geocentric latitude of Mars (in radians)
+	rows = []          # numeric columns of each row
 
 	# reading in opposition csv file
 	with open(opp, 'r') as oppfile:
 		opposition = csv.reader(oppfile)
-		fields = opposition.next()
-
-		# creating list of heliocentric longitudes and geocentric latitudes
+		fields = next(opposition)
 		for row in opposition:
+			rows.append([float(value) for value in row])
+	rows = np.array(rows).reshape(-1, len(fields))
 
-			# Computing heliocentric longitudes (in radians)
-			helioLong.append(math.radians((30 * float(row[3])) + float(row[4]) 
-				+ (float(row[5])/60) + (float(row[6])/3600)))
+	# Computing heliocentric longitudes (in radians)
+	helioLong = kernels.sexagesimalToRadians((30 * rows[:, 3]) + rows[:, 4],
+		rows[:, 5], rows[:, 6]).tolist()
 
-			# Computing geocentric latitudes (in radians)
-			geoLat.append(math.radians(float(row[7]) + (float(row[8])/60)))
+	# Computing geocentric latitudes (in radians)
+	geoLat = kernels.sexagesimalToRadians(rows[:, 7], rows[:, 8]).tolist()
 
 	return helioLong, geoLat
 
 #----------------------------------------------------------------------------#
 
+def loadDates(opp="opposition.csv"):
+	""" Loads the dates of the oppositions contained in opposition.csv.
+
+	Parameters:
+		opp (str): path to the opposition csv file
+
+	Returns:
+		dates (date list): list of opposition dates
+
+	"""
+	dates = []
+
+	# reading in opposition csv file (Day, Month, Year columns)
+	with open(opp, 'r') as oppfile:
+		opposition = csv.reader(oppfile)
+		fields = next(opposition)
+		for row in opposition:
+			dates.append(datetime.date(int(row[2]), int(row[1]), int(row[0])))
+
+	return dates
+
+#----------------------------------------------------------------------------#
+
 def findHelioLat(radius, geoLat):
 	""" Finds heliocentric Mars latitudes from geocentric Mars latitudes.
 
@@ -111,19 +136,23 @@ def findCoordinates(helioLong, helioLat):
 
 #----------------------------------------------------------------------------#
 
-def fitPlane(coordinates):
+def fitPlane(coordinates, compiled=False):
 	""" Fits a plane to the coordinates of Mars on the celestial sphere.
 
 	Parameters:
 		coordinates (float list): list of x-y-z coordinates of Mars on the
 					celestial sphere.
+		compiled (bool): use the compiled gradient descent kernel
 		
 	Returns:
 		planeParameters (float list): coefficients (a,b) of x and y for a 
 					plane with equation ax + by + z = 0
 
 	"""
-	planeParameters = planeGradientDescent.findPlane(coordinates)
+	if compiled:
+		planeParameters = planeGradientDescent.findPlaneCompiled(coordinates)
+	else:
+		planeParameters = planeGradientDescent.findPlane(coordinates)
 	return planeParameters
 
 #----------------------------------------------------------------------------#
@@ -11,6 +11,9 @@
 import numpy as np
 import math
 
+# compiled kernels, with a NumPy fallback when numba is missing
+from .. import kernels
+
 #----------------------------------------------------------------------------#
 
 def evaluateDistance(coordinates, a, b):
@@ -21,6 +24,9 @@ def evaluateDistance(coordinates, a, b):
 	Cost is the sum of squared euclidian distances.
 	Therefore, cost = sum(((ax + by + z)/(a^2 + b^2 + 1))^2)
 
+	The computation runs in the precision (float64 or float32) of the
+	coordinate matrix.
+
 	Parameters:
 		coordinates (float): x-y-z coordinates of Mars locations on the
 							 celestial sphere.
@@ -32,8 +38,8 @@ def evaluateDistance(coordinates, a, b):
 
 	"""
 
-	# creating normal vector for plane
-	normal = np.array([a, b, 1.0])[:,None]
+	# creating normal vector for plane, in the precision of the coordinates
+	normal = np.array([a, b, 1.0], dtype=coordinates.dtype)[:,None]
 
 	# calculating scale (a^2 + b^2 + 1)
 	scale = math.pow(a, 2) + math.pow(b, 2) + 1.0
@@ -42,14 +48,15 @@ def evaluateDistance(coordinates, a, b):
 	distance = np.dot(coordinates, normal) / scale
 
 	# calculating and returning sum of square distances
-	squareDist = float(sum(distance ** 2))
+	squareDist = float(np.sum(distance ** 2))
 	return squareDist
 
 #----------------------------------------------------------------------------#
 
 def computeGradient(coordinates, a, b):
 	""" Computes the gradient vector of the cost with respect to the 
-		parameters of the plane.
+		parameters of the plane. The computation runs in the precision
+		(float64 or float32) of the coordinate matrix.
 
 	Parameters:
 		coordinates (float): x-y-z coordinates of Mars locations on the
@@ -62,8 +69,8 @@ def computeGradient(coordinates, a, b):
 
 	"""
 
-	# creating normal vector for plane
-	normal = np.array([a, b, 1.0])[:,None]
+	# creating normal vector for plane, in the precision of the coordinates
+	normal = np.array([a, b, 1.0], dtype=coordinates.dtype)[:,None]
 
 	# calculating scale (a^2 + b^2 + 1)
 	scale = math.pow(a, 2) + math.pow(b, 2) + 1.0
@@ -82,7 +89,7 @@ def computeGradient(coordinates, a, b):
 	partialB = partialScale * ((-2 * b * linearSum) + scaledY) * linearSum 
 
 	# returning a gradient vector
-	gradient = [float(sum(partialA)), float(sum(partialB))]
+	gradient = [float(np.sum(partialA)), float(np.sum(partialB))]
 	return gradient
 
 #----------------------------------------------------------------------------#
@@ -135,3 +142,25 @@ def findPlane(coordinates):
 	return planeParams
 
 #----------------------------------------------------------------------------#
+
+def findPlaneCompiled(coordinates):
+	""" Same as findPlane, but runs the gradient descent in a compiled
+		kernel (or vectorized NumPy when numba is not installed). The
+		results match findPlane up to floating point rounding.
+
+	Parameters:
+		coordinates (float list): list of x-y-z coordinates of Mars on the
+					celestial sphere.
+		
+	Returns:
+		planeParameters (float list): coefficients (a,b) of x and y for a 
+					plane with equation ax + by + z = 0
+
+	"""
+
+	coordinateMatrix = np.array(coordinates).T
+	a, b, cost = kernels.planeDescent(coordinateMatrix, 0.0, 0.0,
+		kernels.PLANE_ALPHA, kernels.ITERATIONS)
+	return [float(a), float(b)]
+
+#----------------------------------------------------------------------------#
@@ -0,0 +1,100 @@
+""" This module converts between time and position on an elliptical orbit,
+	using Kepler's equation M = E - e sin(E). All functions work on whole
+	arrays of angles at once.
+"""
+
+# Developed by Pulkit Singh, Niheshkumar Rathod & Rajesh Sundaresan
+# Copyright lies with the Robert Bosch Center for Cyber-Physical Systems,
+# Indian Institute of Science, Bangalore, India.
+
+#----------------------------------------------------------------------------#
+
+import numpy as np
+
+# length of the sidereal year (in days), the period of an orbit of 1 AU
+SIDEREAL_YEAR = 365.256363
+
+#----------------------------------------------------------------------------#
+
+def solveKepler(meanAnomaly, eccentricity, tolerance=1e-12, iterations=50):
+	""" Solves Kepler's equation M = E - e sin(E) for the eccentric anomaly
+		with Newton's method, for every mean anomaly at once.
+
+	Parameters:
+		meanAnomaly (float array): mean anomalies (in radians)
+		eccentricity (float): eccentricity of the orbit, below 1
+		tolerance (float): largest acceptable error in E (in radians)
+		iterations (int): largest number of Newton steps
+
+	Returns:
+		eccentricAnomaly (float array): eccentric anomalies (in radians)
+
+	"""
+
+	meanAnomaly = np.asarray(meanAnomaly, dtype=np.float64)
+
+	# starting from M (or pi for very eccentric orbits) always converges
+	if eccentricity < 0.8:
+		eccentricAnomaly = meanAnomaly.copy()
+	else:
+		eccentricAnomaly = np.full_like(meanAnomaly, np.pi)
+
+	for i in range(iterations):
+		step = ((eccentricAnomaly - eccentricity * np.sin(eccentricAnomaly)
+			- meanAnomaly) / (1 - eccentricity * np.cos(eccentricAnomaly)))
+		eccentricAnomaly -= step
+		if np.all(np.abs(step) < tolerance):
+			break
+
+	return eccentricAnomaly
+
+#----------------------------------------------------------------------------#
+
+def trueFromMean(meanAnomaly, eccentricity):
+	""" Converts mean anomalies (time) to true anomalies (angle from the
+		perihelion, as seen from the sun).
+	"""
+
+	eccentricAnomaly = solveKepler(meanAnomaly, eccentricity)
+	return 2 * np.arctan2(np.sqrt(1 + eccentricity)
+		* np.sin(eccentricAnomaly / 2), np.sqrt(1 - eccentricity)
+		* np.cos(eccentricAnomaly / 2))
+
+def meanFromTrue(trueAnomaly, eccentricity):
+	""" Converts true anomalies (angle from the perihelion, as seen from the
+		sun) to mean anomalies (time).
+	"""
+
+	trueAnomaly = np.asarray(trueAnomaly, dtype=np.float64)
+	eccentricAnomaly = 2 * np.arctan2(np.sqrt(1 - eccentricity)
+		* np.sin(trueAnomaly / 2), np.sqrt(1 + eccentricity)
+		* np.cos(trueAnomaly / 2))
+	return eccentricAnomaly - eccentricity * np.sin(eccentricAnomaly)
+
+def radius(trueAnomaly, semiMajorAxis, eccentricity):
+	""" Distance from the sun at the given true anomalies. """
+
+	return (semiMajorAxis * (1 - eccentricity ** 2)
+		/ (1 + eccentricity * np.cos(trueAnomaly)))
+
+#----------------------------------------------------------------------------#
+
+def period(semiMajorAxis):
+	""" Orbital period (in days) of an orbit around the sun, from Kepler's
+		third law, with the semi-major axis in AU.
+	"""
+
+	return SIDEREAL_YEAR * semiMajorAxis ** 1.5
+
+def circularMean(angles):
+	""" Mean direction of a list of angles (in radians). """
+
+	angles = np.asarray(angles, dtype=np.float64)
+	return float(np.arctan2(np.sin(angles).mean(), np.cos(angles).mean()))
+
+def wrapAngle(angles):
+	""" Wraps angles (in radians) into [-pi, pi). """
+
+	return np.mod(np.asarray(angles) + np.pi, 2 * np.pi) - np.pi
+
+#----------------------------------------------------------------------------#
@@ -0,0 +1,518 @@
+""" This module contains the compiled kernels used by the fast paths of the
+	package. When numba is installed the kernels are JIT-compiled (and can
+	run in parallel over batches of datasets); otherwise equivalent NumPy
+	implementations are used, so callers never need to know which one is
+	running.
+"""
+
+# Developed by Pulkit Singh, Niheshkumar Rathod & Rajesh Sundaresan
+# Copyright lies with the Robert Bosch Center for Cyber-Physical Systems,
+# Indian Institute of Science, Bangalore, India.
+
+#----------------------------------------------------------------------------#
+
+import math
+import numpy as np
+
+# numba is optional, the NumPy fallbacks below are used when it is missing
+try:
+	import numba
+	HAVE_NUMBA = True
+except ImportError:
+	numba = None
+	HAVE_NUMBA = False
+
+#----------------------------------------------------------------------------#
+
+def _jit(parallel=False, fastmath=False):
+	""" Returns a decorator compiling a kernel with numba. Compiled kernels
+		are cached on disk, so new worker processes do not have to compile
+		them again.
+	"""
+	return numba.njit(cache=True, parallel=parallel, fastmath=fastmath)
+
+#----------------------------------------------------------------------------#
+# Loop kernels (compiled with numba)
+#----------------------------------------------------------------------------#
+
+def _ellipseDescentLoop(xMars, yMars, xf, yf, axis, alpha, iterations):
+	# same update as ellipseGradientDescent.findEllipse, one pass over the
+	# points per iteration for both the cost and the gradient
+	cost = np.empty(iterations)
+	for it in range(iterations):
+		squareDist = 0.0
+		dxFocus, dyFocus, dmajorAxis = 0.0, 0.0, 0.0
+		for i in range(xMars.shape[0]):
+			distOrigin = math.sqrt(xMars[i] * xMars[i] + yMars[i] * yMars[i])
+			xDiff = xMars[i] - xf
+			yDiff = yMars[i] - yf
+			distFocus = math.sqrt(xDiff * xDiff + yDiff * yDiff)
+			dist = distOrigin + distFocus - axis
+
+			squareDist += dist * dist
+			dxFocus += (-2 * xDiff * dist) / distFocus
+			dyFocus += (-2 * yDiff * dist) / distFocus
+			dmajorAxis += -2 * dist
+
+		cost[it] = squareDist
+		xf = xf - (alpha * dxFocus)
+		yf = yf - (alpha * dyFocus)
+		axis = axis - (alpha * dmajorAxis)
+
+	return xf, yf, axis, cost
+
+def _planeDescentLoop(coordinates, a, b, alpha, iterations):
+	# same update as planeGradientDescent.findPlane
+	cost = np.empty(iterations)
+	for it in range(iterations):
+		scale = a * a + b * b + 1.0
+		partialScale = 2 / (scale * scale * scale)
+		squareDist = 0.0
+		partialA, partialB = 0.0, 0.0
+		for i in range(coordinates.shape[0]):
+			x = coordinates[i, 0]
+			y = coordinates[i, 1]
+			linearSum = (a * x) + (b * y) + coordinates[i, 2]
+			distance = linearSum / scale
+
+			squareDist += distance * distance
+			partialA += partialScale * ((-2 * a * linearSum) + x * scale) \
+				* linearSum
+			partialB += partialScale * ((-2 * b * linearSum) + y * scale) \
+				* linearSum
+
+		cost[it] = squareDist
+		a = a - (alpha * partialA)
+		b = b - (alpha * partialB)
+
+	return a, b, cost
+
+def _ellipseFloat32Loop(xMars, yMars, xf, yf, axis, alpha, iterations):
+	# reduced precision _ellipseDescentLoop: float32 points and per point
+	# arithmetic, float64 sums and parameters. Compiled with fastmath and a
+	# prange, which lets numba vectorize the sums (in a different order,
+	# and so with a different rounding, than findEllipse).
+	cost = np.empty(iterations)
+	distOrigin = np.sqrt(xMars * xMars + yMars * yMars)
+	for it in range(iterations):
+		xfLow = np.float32(xf)
+		yfLow = np.float32(yf)
+		axisLow = np.float32(axis)
+		squareDist = 0.0
+		dxFocus, dyFocus, dmajorAxis = 0.0, 0.0, 0.0
+		for i in numba.prange(xMars.shape[0]):
+			xDiff = xMars[i] - xfLow
+			yDiff = yMars[i] - yfLow
+			distFocus = math.sqrt(xDiff * xDiff + yDiff * yDiff)
+			dist = distOrigin[i] + distFocus - axisLow
+			weight = dist / distFocus
+
+			squareDist += dist * dist
+			dxFocus += xDiff * weight
+			dyFocus += yDiff * weight
+			dmajorAxis += dist
+
+		cost[it] = squareDist
+		xf = xf - (alpha * -2 * dxFocus)
+		yf = yf - (alpha * -2 * dyFocus)
+		axis = axis - (alpha * -2 * dmajorAxis)
+
+	return xf, yf, axis, cost
+
+def _planeFloat32Loop(coordinates, a, b, alpha, iterations):
+	# reduced precision _planeDescentLoop, compiled like _ellipseFloat32Loop.
+	# The partial derivatives are expanded into three sums, see
+	# _planeDescentNumpy.
+	# one contiguous array per column, which vectorizes better
+	x = np.ascontiguousarray(coordinates[:, 0])
+	y = np.ascontiguousarray(coordinates[:, 1])
+	z = np.ascontiguousarray(coordinates[:, 2])
+	cost = np.empty(iterations)
+	for it in range(iterations):
+		scale = a * a + b * b + 1.0
+		partialScale = 2 / (scale * scale * scale)
+		aLow = np.float32(a)
+		bLow = np.float32(b)
+		squareSum, xSum, ySum = 0.0, 0.0, 0.0
+		for i in numba.prange(x.shape[0]):
+			linearSum = (aLow * x[i]) + (bLow * y[i]) + z[i]
+
+			squareSum += linearSum * linearSum
+			xSum += x[i] * linearSum
+			ySum += y[i] * linearSum
+
+		cost[it] = squareSum / (scale * scale)
+		a = a - (alpha * partialScale * (scale * xSum - 2 * a * squareSum))
+		b = b - (alpha * partialScale * (scale * ySum - 2 * b * squareSum))
+
+	return a, b, cost
+
+def _sexagesimalLoop(degrees, minutes, seconds):
+	radians = np.empty(degrees.shape[0])
+	for i in range(degrees.shape[0]):
+		radians[i] = (degrees[i] + (minutes[i] / 60) + (seconds[i] / 3600)) \
+			* (math.pi / 180.0)
+	return radians
+
+def _sexagesimalParallel(degrees, minutes, seconds):
+	radians = np.empty(degrees.shape[0])
+	for i in numba.prange(degrees.shape[0]):
+		radians[i] = (degrees[i] + (minutes[i] / 60) + (seconds[i] / 3600)) \
+			* (math.pi / 180.0)
+	return radians
+
+def _ellipseBatchLoop(xBatch, yBatch, xf, yf, axis, alpha, iterations):
+	# one independent descent per row of the batch, spread over threads
+	parameters = np.empty((xBatch.shape[0], 3))
+	losses = np.empty(xBatch.shape[0])
+	for k in numba.prange(xBatch.shape[0]):
+		xk, yk, ak, cost = _ellipseDescentKernel(xBatch[k], yBatch[k],
+			xf, yf, axis, alpha, iterations)
+		parameters[k, 0] = xk
+		parameters[k, 1] = yk
+		parameters[k, 2] = ak
+		losses[k] = cost[-1]
+	return parameters, losses
+
+def _planeBatchLoop(coordinateBatch, a, b, alpha, iterations):
+	parameters = np.empty((coordinateBatch.shape[0], 2))
+	losses = np.empty(coordinateBatch.shape[0])
+	for k in numba.prange(coordinateBatch.shape[0]):
+		ak, bk, cost = _planeDescentKernel(coordinateBatch[k], a, b,
+			alpha, iterations)
+		parameters[k, 0] = ak
+		parameters[k, 1] = bk
+		losses[k] = cost[-1]
+	return parameters, losses
+
+#----------------------------------------------------------------------------#
+# NumPy fallbacks (used when numba is not installed)
+#----------------------------------------------------------------------------#
+
+def _ellipseDescentNumpy(xMars, yMars, xf, yf, axis, alpha, iterations):
+	# the arrays are computed in the precision of xMars and yMars, in
+	# buffers allocated once; the parameters and costs stay float64.
+	# Distances to the sun do not change between iterations.
+	distOrigin = np.sqrt(xMars * xMars + yMars * yMars)
+	xDiff = np.empty_like(xMars)
+	yDiff = np.empty_like(xMars)
+	distFocus = np.empty_like(xMars)
+	dist = np.empty_like(xMars)
+	cost = np.empty(iterations)
+	for it in range(iterations):
+		np.subtract(xMars, xf, out=xDiff)
+		np.subtract(yMars, yf, out=yDiff)
+		np.multiply(xDiff, xDiff, out=distFocus)
+		np.multiply(yDiff, yDiff, out=dist)
+		distFocus += dist
+		np.sqrt(distFocus, out=distFocus)
+		np.add(distOrigin, distFocus, out=dist)
+		dist -= axis
+
+		cost[it] = float(np.dot(dist, dist))
+		axisGradient = -2 * float(dist.sum())
+
+		# dist / distFocus, the weight of each point in the focus gradient
+		np.divide(dist, distFocus, out=distFocus)
+		xf = xf - (alpha * -2 * float(np.dot(distFocus, xDiff)))
+		yf = yf - (alpha * -2 * float(np.dot(distFocus, yDiff)))
+		axis = axis - (alpha * axisGradient)
+
+	return float(xf), float(yf), float(axis), cost
+
+def _planeDescentNumpy(coordinates, a, b, alpha, iterations):
+	# computed in the precision of coordinates, like _ellipseDescentNumpy.
+	# The partial derivatives are expanded into three dot products:
+	# sum(((-2a l) + x s) l) = s (x . l) - 2a (l . l), with l the linear sums
+	x = np.ascontiguousarray(coordinates[:, 0])
+	y = np.ascontiguousarray(coordinates[:, 1])
+	z = np.ascontiguousarray(coordinates[:, 2])
+	linearSum = np.empty_like(x)
+	temp = np.empty_like(x)
+	cost = np.empty(iterations)
+	for it in range(iterations):
+		scale = a * a + b * b + 1.0
+		partialScale = 2 / (scale * scale * scale)
+		np.multiply(x, a, out=linearSum)
+		np.multiply(y, b, out=temp)
+		linearSum += temp
+		linearSum += z
+
+		squareSum = float(np.dot(linearSum, linearSum))
+		cost[it] = squareSum / (scale * scale)
+		partialA = partialScale * (scale * float(np.dot(x, linearSum))
+			- 2 * a * squareSum)
+		partialB = partialScale * (scale * float(np.dot(y, linearSum))
+			- 2 * b * squareSum)
+		a = a - (alpha * partialA)
+		b = b - (alpha * partialB)
+
+	return float(a), float(b), cost
+
+def _sexagesimalNumpy(degrees, minutes, seconds):
+	return np.radians(degrees + (minutes / 60) + (seconds / 3600))
+
+def _ellipseBatchNumpy(xBatch, yBatch, xf, yf, axis, alpha, iterations):
+	# the whole batch takes one step per iteration, each row has its own
+	# focus and axis
+	count = xBatch.shape[0]
+	losses = np.zeros(count)
+	xf = np.full((count, 1), float(xf))
+	yf = np.full((count, 1), float(yf))
+	axis = np.full((count, 1), float(axis))
+	distOrigin = np.sqrt(xBatch ** 2 + yBatch ** 2)
+	for it in range(iterations):
+		xDiff = xBatch - xf
+		yDiff = yBatch - yf
+		distFocus = np.sqrt(xDiff ** 2 + yDiff ** 2)
+		dist = distOrigin + distFocus - axis
+		weight = (-2 * dist) / distFocus
+
+		# like findEllipse, the loss is the cost before the last update
+		if it == iterations - 1:
+			losses = (dist ** 2).sum(axis=1)
+		xf = xf - (alpha * (weight * xDiff).sum(axis=1, keepdims=True))
+		yf = yf - (alpha * (weight * yDiff).sum(axis=1, keepdims=True))
+		axis = axis - (alpha * -2 * dist.sum(axis=1, keepdims=True))
+
+	parameters = np.hstack([xf, yf, axis])
+	return parameters, losses
+
+def _planeBatchNumpy(coordinateBatch, a, b, alpha, iterations):
+	count = coordinateBatch.shape[0]
+	losses = np.zeros(count)
+	x = coordinateBatch[:, :, 0]
+	y = coordinateBatch[:, :, 1]
+	z = coordinateBatch[:, :, 2]
+	a = np.full((count, 1), float(a))
+	b = np.full((count, 1), float(b))
+	for it in range(iterations):
+		scale = a * a + b * b + 1.0
+		partialScale = 2 / (scale * scale * scale)
+		linearSum = (a * x) + (b * y) + z
+
+		# like findPlane, the loss is the cost before the last update
+		if it == iterations - 1:
+			losses = ((linearSum / scale) ** 2).sum(axis=1)
+		partialA = partialScale * (((-2 * a * linearSum) + x * scale)
+			* linearSum).sum(axis=1, keepdims=True)
+		partialB = partialScale * (((-2 * b * linearSum) + y * scale)
+			* linearSum).sum(axis=1, keepdims=True)
+		a = a - (alpha * partialA)
+		b = b - (alpha * partialB)
+
+	parameters = np.hstack([a, b])
+	return parameters, losses
+
+#----------------------------------------------------------------------------#
+
+# picking the implementation once, at import time
+if HAVE_NUMBA:
+	_ellipseDescentKernel = _jit()(_ellipseDescentLoop)
+	_planeDescentKernel = _jit()(_planeDescentLoop)
+	_ellipseFloat32Kernel = _jit(parallel=True, fastmath=True)(
+		_ellipseFloat32Loop)
+	_planeFloat32Kernel = _jit(parallel=True, fastmath=True)(
+		_planeFloat32Loop)
+	_sexagesimalKernel = _jit()(_sexagesimalLoop)
+	_sexagesimalBatchKernel = _jit(parallel=True)(_sexagesimalParallel)
+	_ellipseBatchKernel = _jit(parallel=True)(_ellipseBatchLoop)
+	_planeBatchKernel = _jit(parallel=True)(_planeBatchLoop)
+else:
+	_ellipseDescentKernel = _ellipseDescentNumpy
+	_planeDescentKernel = _planeDescentNumpy
+	_ellipseFloat32Kernel = _ellipseDescentNumpy
+	_planeFloat32Kernel = _planeDescentNumpy
+	_sexagesimalKernel = _sexagesimalNumpy
+	_sexagesimalBatchKernel = _sexagesimalNumpy
+	_ellipseBatchKernel = _ellipseBatchNumpy
+	_planeBatchKernel = _planeBatchNumpy
+
+# inputs larger than this are converted using the parallel kernel
+PARALLEL_THRESHOLD = 100000
+
+# step sizes and number of iterations of the original gradient descents
+# (ellipseGradientDescent.findEllipse and planeGradientDescent.findPlane)
+ELLIPSE_ALPHA = 0.001
+PLANE_ALPHA = 0.0001
+ITERATIONS = 10000
+
+# the costs are sums over the points, so the original steps grow with the
+# number of points, and diverge somewhere above 900 points for the ellipse
+# and 10000 for the plane. These are the sizes up to which the original
+# steps are kept, see stepSize().
+ELLIPSE_POINTS = 500
+PLANE_POINTS = 5000
+
+def stepSize(alpha, points, count):
+	""" Step size for a gradient descent over count points: alpha up to
+		the given number of points, and scaled down by 1/count above it,
+		so that the descent behaves as it does on that many points.
+	"""
+
+	return alpha * min(1.0, float(points) / max(count, 1))
+
+#----------------------------------------------------------------------------#
+
+def ellipseDescent(xMars, yMars, xf, yf, axis, alpha, iterations,
+	dtype=np.float64):
+	""" Runs gradient descent for the best-fit ellipse, with one focus at
+		the sun. Matches ellipseGradientDescent.findEllipse.
+
+	Parameters:
+		xMars  (float list): x-coordinates of Mars locations
+		yMars  (float list): y-coordinates of Mars locations
+		xf (float): initial x-coordinate of second focus
+		yf (float): initial y-coordinate of second focus
+		axis (float): initial length of the major axis
+		alpha (float): step size
+		iterations (int): number of gradient descent iterations
+		dtype (numpy dtype): precision the locations are read in. With
+					float32 the arithmetic on each location is float32
+					too, with float64 sums, in a vectorized kernel
+
+	Returns:
+		xf (float): x-coordinate of the found focus
+		yf (float): y-coordinate of the found focus
+		axis (float): length of the major axis
+		cost (float array): cost in each gradient descent iteration
+
+	"""
+
+	xMars = np.ascontiguousarray(xMars, dtype=dtype)
+	yMars = np.ascontiguousarray(yMars, dtype=dtype)
+	kernel = _ellipseDescentKernel
+	if xMars.dtype == np.float32:
+		kernel = _ellipseFloat32Kernel
+	return kernel(xMars, yMars, float(xf), float(yf), float(axis),
+		float(alpha), int(iterations))
+
+#----------------------------------------------------------------------------#
+
+def planeDescent(coordinates, a, b, alpha, iterations, dtype=np.float64):
+	""" Runs gradient descent for the best-fit plane ax + by + z = 0.
+		Matches planeGradientDescent.findPlane.
+
+	Parameters:
+		coordinates (float array): n x 3 matrix of x-y-z coordinates of
+					Mars on the celestial sphere
+		a (float): initial coefficient of x in plane equation
+		b (float): initial coefficient of y in plane equation
+		alpha (float): step size
+		iterations (int): number of gradient descent iterations
+		dtype (numpy dtype): precision the coordinates are read in, as
+					in ellipseDescent
+
+	Returns:
+		a (float): coefficient of x in plane equation
+		b (float): coefficient of y in plane equation
+		cost (float array): cost in each gradient descent iteration
+
+	"""
+
+	coordinates = np.ascontiguousarray(coordinates, dtype=dtype)
+	kernel = _planeDescentKernel
+	if coordinates.dtype == np.float32:
+		kernel = _planeFloat32Kernel
+	return kernel(coordinates, float(a), float(b), float(alpha),
+		int(iterations))
+
+#----------------------------------------------------------------------------#
+
+def ellipseDescentBatch(xBatch, yBatch, xf, yf, axis, alpha, iterations):
+	""" Runs ellipseDescent independently on every row of a batch of
+		datasets. With numba the rows are fitted in parallel.
+
+	Parameters:
+		xBatch (float array): k x n matrix of x-coordinates, one dataset
+					per row
+		yBatch (float array): k x n matrix of y-coordinates
+		xf, yf, axis (float): initial parameters, shared by every row
+		alpha (float): step size
+		iterations (int): number of gradient descent iterations
+
+	Returns:
+		parameters (float array): k x 3 matrix of [xf, yf, axis]
+		losses (float array): final cost of each row
+
+	"""
+
+	xBatch = np.ascontiguousarray(xBatch, dtype=np.float64)
+	yBatch = np.ascontiguousarray(yBatch, dtype=np.float64)
+	return _ellipseBatchKernel(xBatch, yBatch, float(xf), float(yf),
+		float(axis), float(alpha), int(iterations))
+
+#----------------------------------------------------------------------------#
+
+def planeDescentBatch(coordinateBatch, a, b, alpha, iterations):
+	""" Runs planeDescent independently on every dataset of a batch. With
+		numba the datasets are fitted in parallel.
+
+	Parameters:
+		coordinateBatch (float array): k x n x 3 array of coordinates, one
+					dataset per entry of the first axis
+		a, b (float): initial plane parameters, shared by every dataset
+		alpha (float): step size
+		iterations (int): number of gradient descent iterations
+
+	Returns:
+		parameters (float array): k x 2 matrix of [a, b]
+		losses (float array): final cost of each dataset
+
+	"""
+
+	coordinateBatch = np.ascontiguousarray(coordinateBatch, dtype=np.float64)
+	return _planeBatchKernel(coordinateBatch, float(a), float(b),
+		float(alpha), int(iterations))
+
+#----------------------------------------------------------------------------#
+
+def sexagesimalToRadians(degrees, minutes, seconds=None):
+	""" Converts angles given in degrees, minutes and seconds to radians.
+
+	Parameters:
+		degrees (float list): whole degrees of each angle
+		minutes (float list): minutes of each angle
+		seconds (float list): seconds of each angle (optional)
+
+	Returns:
+		radians (float array): angles in radians
+
+	"""
+
+	degrees = np.ascontiguousarray(degrees, dtype=np.float64)
+	minutes = np.ascontiguousarray(minutes, dtype=np.float64)
+	if seconds is None:
+		seconds = np.zeros_like(degrees)
+	else:
+		seconds = np.ascontiguousarray(seconds, dtype=np.float64)
+
+	if len(degrees) >= PARALLEL_THRESHOLD:
+		return _sexagesimalBatchKernel(degrees, minutes, seconds)
+	return _sexagesimalKernel(degrees, minutes, seconds)
+
+#----------------------------------------------------------------------------#
+
+def warmUp():
+	""" Runs every kernel once on a tiny input, so that JIT compilation (or
+		loading the compiled kernels from the on-disk cache) happens now
+		rather than on the first real call. Worker processes should call
+		this when they start. Does nothing without numba.
+	"""
+
+	if not HAVE_NUMBA:
+		return
+
+	x = np.array([1.0, 0.0, -1.0])
+	y = np.array([0.0, 1.0, 0.5])
+	coordinates = np.column_stack([x, y, y])
+	for dtype in [np.float64, np.float32]:
+		ellipseDescent(x, y, 0.0, 0.0, 0.0, 0.001, 1, dtype)
+		planeDescent(coordinates, 0.0, 0.0, 0.0001, 1, dtype)
+	ellipseDescentBatch(x[None, :], y[None, :], 0.0, 0.0, 0.0, 0.001, 1)
+	planeDescentBatch(coordinates[None, :, :], 0.0, 0.0, 0.0001, 1)
+
+	_sexagesimalKernel(x, y, y)
+	_sexagesimalBatchKernel(x, y, y)
+
+#----------------------------------------------------------------------------#
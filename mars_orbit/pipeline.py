@@ -0,0 +1,215 @@
+""" This module runs the complete workshop computation (triangulation,
+	orbital plane and orbit fits) on a directory of data files, without
+	a notebook, and writes the results to disk.
+"""
+
+# Developed by Pulkit Singh, Niheshkumar Rathod & Rajesh Sundaresan
+# Copyright lies with the Robert Bosch Center for Cyber-Physical Systems,
+# Indian Institute of Science, Bangalore, India.
+
+#----------------------------------------------------------------------------#
+
+import csv
+import os
+import time
+import numpy as np
+
+from .triangulateMars import triangulate
+from .fitPlane import plane
+from .fitOrbit import orbit
+from . import profiling
+
+#----------------------------------------------------------------------------#
+
+def runPipeline(directory, plots=False, compiled=False, eccentricEarth=False):
+	""" Runs triangulation, plane fitting and orbit fitting on the
+		triangulation.csv and opposition.csv files in a directory.
+
+	Parameters:
+		directory (str): directory containing the two data files
+		plots (bool): show the workshop plots after each stage
+		compiled (bool): use the compiled gradient descent kernels
+		eccentricEarth (bool): place Earth on its elliptical orbit
+
+	Returns:
+		results (dict): name -> result of each step of the workshop
+		timings (list): (stage, seconds) for each stage, in order
+
+	"""
+
+	results = {}
+	timings = []
+
+	# Part 1: triangulating the projections of Mars on the ecliptic plane
+	start = time.time()
+	earthLocations, marsAngles = triangulate.loadData(
+		os.path.join(directory, "triangulation.csv"), eccentricEarth)
+
+	# observations come in consecutive pairs
+	marsLocations = []
+	for i in range(len(earthLocations) // 2):
+		marsLocations.append(triangulate.findMars(
+			earthLocations[2 * i], marsAngles[2 * i],
+			earthLocations[2 * i + 1], marsAngles[2 * i + 1]))
+	triangulatedRadius = triangulate.computeRadius(marsLocations)
+	timings.append(("triangulate", time.time() - start))
+
+	results["marsLocations"] = marsLocations
+	results["triangulatedRadius"] = triangulatedRadius
+	if plots:
+		triangulate.plotEarthLocations(earthLocations)
+		triangulate.plotTriangulations(marsLocations, triangulatedRadius)
+
+	# Part 2: fitting the orbital plane on the celestial sphere
+	start = time.time()
+	helioLong, geoLat = plane.loadData(
+		os.path.join(directory, "opposition.csv"))
+	helioLat = plane.findHelioLat(triangulatedRadius, geoLat)
+	coordinates = plane.findCoordinates(helioLong, helioLat)
+	planeParameters = plane.fitPlane(coordinates, compiled)
+	orbitalInclination = plane.findInclination(planeParameters)
+	timings.append(("plane", time.time() - start))
+
+	results["coordinates"] = coordinates
+	results["planeParameters"] = planeParameters
+	results["orbitalInclination"] = orbitalInclination
+	if plots:
+		plane.plotPlane(coordinates, planeParameters)
+
+	# Part 3: lifting the triangulations and fitting a circle and an ellipse
+	start = time.time()
+	liftedLocations = orbit.liftCoordinates(planeParameters, marsLocations)
+	circleRadius, circleLoss = orbit.fitCircle(liftedLocations)
+	ellipseParameters, ellipseLoss = orbit.fitEllipse(liftedLocations,
+		compiled)
+	timings.append(("orbit", time.time() - start))
+
+	results["liftedLocations"] = liftedLocations
+	results["circleRadius"] = circleRadius
+	results["circleLoss"] = circleLoss
+	results["ellipseParameters"] = ellipseParameters
+	results["ellipseLoss"] = ellipseLoss
+	if plots:
+		orbit.plotBoth(liftedLocations, circleRadius, ellipseParameters)
+
+	return results, timings
+
+#----------------------------------------------------------------------------#
+
+def summarise(results):
+	""" Collects the scalar results of a run into a single flat row.
+
+	Parameters:
+		results (dict): results returned by runPipeline
+
+	Returns:
+		summary (list): (column, value) pairs
+
+	"""
+
+	xf, yf, axis = results["ellipseParameters"]
+	a, b = results["planeParameters"]
+	return [
+		("triangulatedRadius", results["triangulatedRadius"]),
+		("planeA", a),
+		("planeB", b),
+		("orbitalInclination", results["orbitalInclination"]),
+		("circleRadius", results["circleRadius"]),
+		("circleLoss", results["circleLoss"]),
+		("ellipseFocusX", xf),
+		("ellipseFocusY", yf),
+		("ellipseMajorAxis", axis),
+		("ellipseLoss", results["ellipseLoss"]),
+	]
+
+#----------------------------------------------------------------------------#
+
+def writeResults(outputDirectory, results, timings):
+	""" Writes the results of a run as results.npz (every array), plus
+		summary.csv (scalar results) and timings.csv (seconds per stage).
+
+	Parameters:
+		outputDirectory (str): directory to write to, created if needed
+		results (dict): results returned by runPipeline
+		timings (list): timings returned by runPipeline
+
+	"""
+
+	if not os.path.isdir(outputDirectory):
+		os.makedirs(outputDirectory)
+
+	arrays = {}
+	for name, value in results.items():
+		arrays[name] = np.asarray(value, dtype=np.float64)
+	np.savez(os.path.join(outputDirectory, "results.npz"), **arrays)
+
+	writeTable(os.path.join(outputDirectory, "summary.csv"),
+		["quantity", "value"], summarise(results))
+	writeTable(os.path.join(outputDirectory, "timings.csv"),
+		["stage", "seconds"], timings)
+
+#----------------------------------------------------------------------------#
+
+def writeTable(fileName, fields, rows):
+	""" Writes a list of rows to a csv file, with a heading line. """
+
+	with open(fileName, 'w') as outfile:
+		writer = csv.writer(outfile)
+		writer.writerow(fields)
+		for row in rows:
+			writer.writerow(row)
+
+#----------------------------------------------------------------------------#
+
+def runDirectory(task):
+	""" Runs the pipeline on one directory and writes its results. Takes a
+		single tuple so that it can be used with multiprocessing.Pool.map.
+		A failing directory does not raise, so that the other directories
+		of a batch still run; its error is returned in the summary instead.
+
+	Parameters:
+		task (tuple): (input directory, output directory, plots, compiled,
+					eccentricEarth, profiled, profileMemory). When
+					profiled, a per-function profile is also written to
+					profile.json and profile.pstats. With profileMemory,
+					the pipeline runs a second time with memory tracing,
+					which would slow down the timed run, to add the peak
+					memory of each function.
+
+	Returns:
+		summary (list): (column, value) pairs of scalar results and
+					per-stage timings, or of the directory and the error
+					when the run failed
+
+	"""
+
+	(directory, outputDirectory, plots, compiled, eccentricEarth, profiled,
+		profileMemory) = task
+	try:
+		if profiled:
+			with profiling.profile(memory=False) as runProfile:
+				results, timings = runPipeline(directory, plots, compiled,
+					eccentricEarth)
+			if profileMemory:
+				with profiling.profile(memory=True) as memoryProfile:
+					runPipeline(directory, False, compiled, eccentricEarth)
+				runProfile.addPeakBytes(memoryProfile)
+		else:
+			results, timings = runPipeline(directory, plots, compiled,
+				eccentricEarth)
+		writeResults(outputDirectory, results, timings)
+
+		if profiled:
+			runProfile.toJSON(os.path.join(outputDirectory, "profile.json"))
+			runProfile.toPstats(os.path.join(outputDirectory,
+				"profile.pstats"))
+	except Exception as error:
+		return [("directory", directory),
+			("error", "%s: %s" % (type(error).__name__, error))]
+
+	summary = [("directory", directory)] + summarise(results)
+	for stage, seconds in timings:
+		summary.append((stage + "Seconds", seconds))
+	return summary
+
+#----------------------------------------------------------------------------#
@@ -0,0 +1,294 @@
+""" This module contains vectorized versions of the triangulation, the
+	celestial sphere coordinates, the circle fit and the gradient descent
+	fits that can run in reduced precision (float32). Halving the size of
+	every array halves the memory traffic, which is what limits large
+	synthetic runs.
+
+	The fits run most of their iterations in the requested precision (in
+	the compiled kernels) and the last ones in float64, and check
+	themselves against a float64 reference: a fit on all of the data for
+	small inputs, and on a sample of it for large ones.
+"""
+
+# Developed by Pulkit Singh, Niheshkumar Rathod & Rajesh Sundaresan
+# Copyright lies with the Robert Bosch Center for Cyber-Physical Systems,
+# Indian Institute of Science, Bangalore, India.
+
+#----------------------------------------------------------------------------#
+
+import warnings
+import numpy as np
+
+from . import kernels
+
+# precision used by the fast paths unless told otherwise
+DEFAULT_DTYPE = np.float32
+
+#----------------------------------------------------------------------------#
+
+def findMars(earthLocations1, marsAngles1, earthLocations2, marsAngles2,
+	dtype=DEFAULT_DTYPE):
+	""" Triangulates many locations of Mars at once, as triangulate.findMars
+		does for a single pair of observations.
+
+	Parameters:
+		earthLocations1 (float list): n x 2 first paired locations
+		marsAngles1 (float list): n first paired angles
+		earthLocations2 (float list): n x 2 second paired locations
+		marsAngles2 (float list): n second paired angles
+		dtype (numpy dtype): precision of the computation
+
+	Returns:
+		marsLocations (float array): n x 2 x-y coordinates of Mars
+
+	"""
+
+	earthLocations1 = np.asarray(earthLocations1, dtype=dtype)
+	earthLocations2 = np.asarray(earthLocations2, dtype=dtype)
+	x1, y1 = earthLocations1[:, 0], earthLocations1[:, 1]
+	x2, y2 = earthLocations2[:, 0], earthLocations2[:, 1]
+	tan1 = np.tan(np.asarray(marsAngles1, dtype=dtype))
+	tan2 = np.tan(np.asarray(marsAngles2, dtype=dtype))
+
+	# same formulas as triangulate.findMars
+	xMars = (y2 - y1 + (x1 * tan1) - (x2 * tan2)) / (tan1 - tan2)
+	yMars = ((x2 - x1 + (y1 / tan1) - (y2 / tan2))
+		/ ((1 / tan1) - (1 / tan2)))
+
+	return np.column_stack([xMars, yMars])
+
+#----------------------------------------------------------------------------#
+
+def findCoordinates(helioLong, helioLat, dtype=DEFAULT_DTYPE):
+	""" Finds coordinates of Mars on the celestial sphere, as
+		plane.findCoordinates does.
+
+	Parameters:
+		helioLong (float list): list of heliocentric Mars longitudes
+		helioLat  (float list): list of heliocentric Mars latitudes
+		dtype (numpy dtype): precision of the computation
+
+	Returns:
+		coordinates (float array): 3 x n x-y-z coordinates of Mars on the
+								  celestial sphere
+
+	"""
+
+	helioLong = np.asarray(helioLong, dtype=dtype)
+	polarAngle = (np.pi / 2.0) - np.asarray(helioLat, dtype=dtype)
+
+	xMars = np.sin(polarAngle) * np.cos(helioLong)
+	yMars = np.sin(polarAngle) * np.sin(helioLong)
+	zMars = np.cos(polarAngle)
+	return np.vstack([xMars, yMars, zMars])
+
+#----------------------------------------------------------------------------#
+
+def fitCircle(liftedLocations, dtype=DEFAULT_DTYPE):
+	""" Fits a circle for the orbit of Mars, as orbit.fitCircle does.
+
+	Parameters:
+		liftedLocations (float list): x-y-z coordinates of Mars on its
+					orbital plane
+		dtype (numpy dtype): precision of the computation
+
+	Returns:
+		r (float): radius of best-fit circle
+		loss (float): sum of losses in fitting the circle
+
+	"""
+
+	liftedLocations = np.asarray(liftedLocations, dtype=dtype)
+	rMars = np.sqrt(np.sum(liftedLocations ** 2, axis=1))
+	r = rMars.mean()
+	return float(r), float(np.sum((r - rMars) ** 2))
+
+#----------------------------------------------------------------------------#
+
+def errorReport(fast, reference, tolerance):
+	""" Compares parameters found by a fast path with a reference.
+
+	Parameters:
+		fast (float list): parameters from the fast path
+		reference (float list): parameters from the float64 reference
+		tolerance (float): largest acceptable relative error
+
+	Returns:
+		report (dict): fast and reference parameters, largest absolute
+					and relative errors, and whether they are within
+					tolerance
+
+	"""
+
+	fast = np.asarray(fast, dtype=np.float64)
+	reference = np.asarray(reference, dtype=np.float64)
+	absError = np.abs(fast - reference)
+	relError = absError / np.maximum(np.abs(reference), np.finfo(float).tiny)
+
+	return {
+		"fast": fast.tolist(),
+		"reference": reference.tolist(),
+		"maxAbsError": float(absError.max()),
+		"maxRelError": float(relError.max()),
+		"tolerance": tolerance,
+		"withinTolerance": bool(relError.max() <= tolerance),
+	}
+
+def _sample(count, sampleSize, seed):
+	# indices of the observations the reference is computed on, or None
+	# when it is computed on all of them
+	if count <= sampleSize:
+		return None
+	return np.sort(np.random.RandomState(seed).choice(count, sampleSize,
+		replace=False))
+
+def _checkFinite(parameters, name):
+	if not np.all(np.isfinite(parameters)):
+		raise RuntimeError("%s: gradient descent diverged to %s"
+			% (name, parameters))
+
+def _checkReport(report, name):
+	if not report["withinTolerance"]:
+		warnings.warn("%s: relative error %.3g against the float64 "
+			"reference exceeds %.3g" % (name, report["maxRelError"],
+			report["tolerance"]), RuntimeWarning)
+
+#----------------------------------------------------------------------------#
+
+def _descendEllipse(xMars, yMars, dtype, iterations, refineIterations,
+	alpha):
+	# runs the reduced precision iterations, then finishes in float64
+	xf, yf, axis, cost = kernels.ellipseDescent(xMars, yMars, 0.0, 0.0, 0.0,
+		alpha, iterations - refineIterations, dtype)
+	return kernels.ellipseDescent(xMars, yMars, xf, yf, axis, alpha,
+		refineIterations)
+
+def fitEllipse(liftedLocations, dtype=DEFAULT_DTYPE, iterations=kernels.ITERATIONS,
+	refineIterations=1000, sampleSize=1000, tolerance=1e-4, seed=0):
+	""" Fits an ellipse for the orbit of Mars like orbit.fitEllipse, with
+		most gradient descent iterations in reduced precision and the last
+		refineIterations in float64. Above kernels.ELLIPSE_POINTS locations
+		the step is scaled down by 1/n (see kernels.stepSize), where the
+		original step would diverge.
+
+		The result is compared with a float64 fit, on all the locations
+		when there are at most sampleSize of them, and otherwise on a
+		sample of sampleSize locations (fitted in both precisions),
+		warning when they disagree by more than the tolerance.
+
+	Parameters:
+		liftedLocations (float list): x-y-z coordinates of Mars on its
+					orbital plane
+		dtype (numpy dtype): precision of the first iterations
+		iterations (int): total number of gradient descent iterations
+		refineIterations (int): number of final float64 iterations
+		sampleSize (int): number of locations used for the error report
+		tolerance (float): largest acceptable relative error
+		seed (int): seed used to draw the sample
+
+	Returns:
+		ellipseParameters (float list): x-y coordinates of second focus,
+			length of the major axis
+		loss (float): sum of losses in fitting the ellipse
+		report (dict): comparison with the float64 reference (see
+			errorReport)
+
+	"""
+
+	liftedLocations = np.asarray(liftedLocations, dtype=np.float64)
+	xMars = np.ascontiguousarray(liftedLocations[:, 0])
+	yMars = np.ascontiguousarray(liftedLocations[:, 1])
+	refineIterations = min(max(refineIterations, 1), iterations)
+
+	def descend(rows, dtype, refineIterations):
+		# fits the rows (all of them for None) with a step for their count
+		x, y = (xMars, yMars) if rows is None else (xMars[rows], yMars[rows])
+		alpha = kernels.stepSize(kernels.ELLIPSE_ALPHA,
+			kernels.ELLIPSE_POINTS, len(x))
+		return _descendEllipse(x, y, dtype, iterations, refineIterations,
+			alpha)
+
+	xf, yf, axis, cost = descend(None, dtype, refineIterations)
+	_checkFinite([xf, yf, axis], "fitEllipse")
+
+	# checking the reduced precision path against float64
+	rows = _sample(len(xMars), sampleSize, seed)
+	if rows is None:
+		sampleFast = [xf, yf, axis]
+	else:
+		sampleFast = descend(rows, dtype, refineIterations)[:3]
+	sampleReference = descend(rows, np.float64, iterations)[:3]
+	report = errorReport(sampleFast, sampleReference, tolerance)
+	_checkReport(report, "fitEllipse")
+
+	return [xf, yf, axis], float(cost[-1]), report
+
+#----------------------------------------------------------------------------#
+
+def _descendPlane(coordinateMatrix, dtype, iterations, refineIterations,
+	alpha):
+	# runs the reduced precision iterations, then finishes in float64
+	a, b, cost = kernels.planeDescent(coordinateMatrix, 0.0, 0.0, alpha,
+		iterations - refineIterations, dtype)
+	return kernels.planeDescent(coordinateMatrix, a, b, alpha,
+		refineIterations)
+
+def fitPlane(coordinates, dtype=DEFAULT_DTYPE, iterations=kernels.ITERATIONS,
+	refineIterations=1000, sampleSize=1000, tolerance=1e-4, seed=0):
+	""" Fits a plane to the coordinates of Mars on the celestial sphere like
+		plane.fitPlane, with most gradient descent iterations in reduced
+		precision and the last refineIterations in float64. Above
+		kernels.PLANE_POINTS coordinates the step is scaled down by 1/n
+		(see kernels.stepSize), where the original step would diverge.
+
+		The result is compared with a float64 fit, on all the coordinates
+		when there are at most sampleSize of them, and otherwise on a
+		sample of sampleSize coordinates (fitted in both precisions),
+		warning when they disagree by more than the tolerance.
+
+	Parameters:
+		coordinates (float list): list of x-y-z coordinates of Mars on the
+					celestial sphere.
+		dtype (numpy dtype): precision of the first iterations
+		iterations (int): total number of gradient descent iterations
+		refineIterations (int): number of final float64 iterations
+		sampleSize (int): number of coordinates used for the error report
+		tolerance (float): largest acceptable relative error
+		seed (int): seed used to draw the sample
+
+	Returns:
+		planeParameters (float list): coefficients (a,b) of x and y for a
+					plane with equation ax + by + z = 0
+		report (dict): comparison with the float64 reference (see
+					errorReport)
+
+	"""
+
+	coordinateMatrix = np.ascontiguousarray(np.asarray(coordinates,
+		dtype=np.float64).T)
+	refineIterations = min(max(refineIterations, 1), iterations)
+
+	def descend(rows, dtype, refineIterations):
+		# fits the rows (all of them for None) with a step for their count
+		matrix = coordinateMatrix if rows is None else coordinateMatrix[rows]
+		alpha = kernels.stepSize(kernels.PLANE_ALPHA, kernels.PLANE_POINTS,
+			len(matrix))
+		return _descendPlane(matrix, dtype, iterations, refineIterations,
+			alpha)
+
+	a, b, cost = descend(None, dtype, refineIterations)
+	_checkFinite([a, b], "fitPlane")
+
+	# checking the reduced precision path against float64
+	rows = _sample(len(coordinateMatrix), sampleSize, seed)
+	if rows is None:
+		sampleFast = [a, b]
+	else:
+		sampleFast = descend(rows, dtype, refineIterations)[:2]
+	sampleReference = descend(rows, np.float64, iterations)[:2]
+	report = errorReport(sampleFast, sampleReference, tolerance)
+	_checkReport(report, "fitPlane")
+
+	return [a, b], report
+
+#----------------------------------------------------------------------------#
@@ -0,0 +1,271 @@
+""" This module measures where the time (and memory) of a run goes. Inside
+	a profile context, every public function of the triangulate, plane,
+	planeGradientDescent, orbit and ellipseGradientDescent modules is
+	timed, counted and (optionally) has its peak memory traced:
+
+		with mars_orbit.profile() as p:
+			pipeline.runPipeline("data")
+		p.report()
+
+	The functions are only wrapped while the context is active, so there
+	is no overhead at all outside of it. Memory tracing is off by default:
+	tracemalloc slows the run down several times, and calls that allocate
+	a lot far more than others, which distorts the timings. Trace memory
+	in a separate run and combine the two with addPeakBytes().
+"""
+
+# Developed by Pulkit Singh, Niheshkumar Rathod & Rajesh Sundaresan
+# Copyright lies with the Robert Bosch Center for Cyber-Physical Systems,
+# Indian Institute of Science, Bangalore, India.
+
+#----------------------------------------------------------------------------#
+
+import functools
+import inspect
+import json
+import marshal
+import sys
+import timeit
+
+# tracemalloc (with reset_peak) is only available on Python 3.9+
+try:
+	import tracemalloc
+	HAVE_TRACEMALLOC = hasattr(tracemalloc, "reset_peak")
+except ImportError:
+	tracemalloc = None
+	HAVE_TRACEMALLOC = False
+
+from .triangulateMars import triangulate
+from .fitPlane import plane
+from .fitOrbit import orbit
+
+# the modules whose public functions are profiled. The gradient descent
+# modules are taken from their users, so that we patch the same module
+# objects that they call into.
+MODULES = [triangulate, plane, plane.planeGradientDescent, orbit,
+	orbit.ellipseGradientDescent]
+
+#----------------------------------------------------------------------------#
+
+def publicFunctions(module):
+	""" Returns the (name, function) pairs of the public functions defined
+		in a module, skipping the ones it imports from elsewhere.
+	"""
+
+	functions = []
+	for name, value in sorted(vars(module).items()):
+		if (not name.startswith("_") and inspect.isfunction(value)
+			and value.__module__ == module.__name__):
+			functions.append((name, value))
+	return functions
+
+#----------------------------------------------------------------------------#
+
+class Profile(object):
+	""" Collects wall time, call counts and peak memory per function while
+		it is active. Use through profile().
+
+	Parameters:
+		memory (bool): trace peak memory with tracemalloc. Tracing slows
+					down allocation heavy code, so the timings of a
+					traced run are not representative.
+
+	Attributes:
+		stats (dict): function name -> dict with calls, totalSeconds
+					(including callees), selfSeconds (excluding callees)
+					and peakBytes (largest increase in traced memory during
+					a single call, None without memory tracing)
+
+	"""
+
+	def __init__(self, memory=False):
+		self.memory = memory and HAVE_TRACEMALLOC
+		self.stats = {}
+		self._callers = {}       # (caller, callee) -> [calls, totalSeconds]
+		self._locations = {}     # name -> (file, line, function name)
+		self._stack = []         # [name, start, childSeconds, startMemory,
+		                         #  peakMemory] for each active call
+		self._patched = []       # (module, attribute, original function)
+		self._startedTracing = False
+
+	#------------------------------------------------------------------------#
+
+	def _enter(self, name):
+		start = timeit.default_timer()
+		startMemory = peakMemory = 0
+		if self.memory:
+			startMemory, peakMemory = tracemalloc.get_traced_memory()
+			for frame in self._stack:
+				frame[4] = max(frame[4], peakMemory)
+			tracemalloc.reset_peak()
+			peakMemory = startMemory
+		self._stack.append([name, start, 0.0, startMemory, peakMemory])
+
+	def _exit(self):
+		name, start, childSeconds, startMemory, peakMemory = self._stack.pop()
+		seconds = timeit.default_timer() - start
+
+		peakBytes = None
+		if self.memory:
+			peakMemory = max(peakMemory, tracemalloc.get_traced_memory()[1])
+			for frame in self._stack:
+				frame[4] = max(frame[4], peakMemory)
+			peakBytes = peakMemory - startMemory
+
+		stat = self.stats[name]
+		stat["calls"] += 1
+		stat["totalSeconds"] += seconds
+		stat["selfSeconds"] += seconds - childSeconds
+		if peakBytes is not None:
+			stat["peakBytes"] = max(stat["peakBytes"] or 0, peakBytes)
+
+		caller = self._stack[-1][0] if self._stack else None
+		if caller is not None:
+			self._stack[-1][2] += seconds
+		edge = self._callers.setdefault((caller, name), [0, 0.0])
+		edge[0] += 1
+		edge[1] += seconds
+
+	def _wrap(self, name, function):
+		profile = self
+
+		@functools.wraps(function)
+		def wrapper(*args, **kwargs):
+			profile._enter(name)
+			try:
+				return function(*args, **kwargs)
+			finally:
+				profile._exit()
+
+		return wrapper
+
+	#------------------------------------------------------------------------#
+
+	def start(self):
+		""" Starts profiling, by wrapping the profiled functions. """
+
+		for module in MODULES:
+			prefix = module.__name__.rsplit(".", 1)[-1]
+			for attribute, function in publicFunctions(module):
+				name = prefix + "." + attribute
+				code = function.__code__
+				self._locations[name] = (code.co_filename,
+					code.co_firstlineno, attribute)
+				self.stats.setdefault(name, {"calls": 0, "totalSeconds": 0.0,
+					"selfSeconds": 0.0, "peakBytes": None})
+
+				setattr(module, attribute, self._wrap(name, function))
+				self._patched.append((module, attribute, function))
+
+		if self.memory and not tracemalloc.is_tracing():
+			tracemalloc.start()
+			self._startedTracing = True
+
+	def stop(self):
+		""" Stops profiling and restores the original functions. """
+
+		while self._patched:
+			module, attribute, function = self._patched.pop()
+			setattr(module, attribute, function)
+
+		if self._startedTracing:
+			tracemalloc.stop()
+			self._startedTracing = False
+
+	def __enter__(self):
+		self.start()
+		return self
+
+	def __exit__(self, *exc):
+		self.stop()
+
+	#------------------------------------------------------------------------#
+
+	def addPeakBytes(self, other):
+		""" Takes the peak memory of each function from another profile,
+			typically a separate run with memory tracing, keeping the
+			timings of this one.
+		"""
+
+		for name, stat in other.stats.items():
+			if name in self.stats and stat["peakBytes"] is not None:
+				self.stats[name]["peakBytes"] = stat["peakBytes"]
+
+	def sortedStats(self, sortBy="totalSeconds"):
+		""" Returns (name, stat) pairs of the functions that were called,
+			largest first.
+
+		Parameters:
+			sortBy (str): calls, totalSeconds, selfSeconds or peakBytes
+
+		"""
+
+		called = [(name, stat) for name, stat in self.stats.items()
+			if stat["calls"]]
+		return sorted(called, key=lambda item: (item[1][sortBy] or 0),
+			reverse=True)
+
+	def report(self, sortBy="totalSeconds", stream=None):
+		""" Prints a table of the profiled functions.
+
+		Parameters:
+			sortBy (str): calls, totalSeconds, selfSeconds or peakBytes
+			stream (file): where to print (default: standard output)
+
+		"""
+
+		stream = stream or sys.stdout
+		line = "%-40s %8s %12s %12s %12s\n"
+		stream.write(line % ("function", "calls", "total (s)", "self (s)",
+			"peak (KiB)"))
+		for name, stat in self.sortedStats(sortBy):
+			peak = stat["peakBytes"]
+			stream.write(line % (name, stat["calls"],
+				"%.6f" % stat["totalSeconds"], "%.6f" % stat["selfSeconds"],
+				"-" if peak is None else "%.1f" % (peak / 1024.0)))
+
+	def toJSON(self, fileName):
+		""" Writes the statistics of the called functions to a JSON file. """
+
+		with open(fileName, "w") as outfile:
+			json.dump(dict(self.sortedStats()), outfile, indent=2,
+				sort_keys=True)
+
+	def toPstats(self, fileName):
+		""" Writes the timings in the format of the profile module, so that
+			they can be read with pstats.Stats(fileName) (or snakeviz).
+		"""
+
+		stats = {}
+		for name, stat in self.stats.items():
+			if not stat["calls"]:
+				continue
+			callers = {}
+			for (caller, callee), (calls, seconds) in self._callers.items():
+				if callee == name and caller is not None:
+					callers[self._locations[caller]] = (calls, calls, 0.0,
+						seconds)
+			stats[self._locations[name]] = (stat["calls"], stat["calls"],
+				stat["selfSeconds"], stat["totalSeconds"], callers)
+
+		with open(fileName, "wb") as outfile:
+			marshal.dump(stats, outfile)
+
+#----------------------------------------------------------------------------#
+
+def profile(memory=False):
+	""" Returns a profiling context for the package functions.
+
+	Parameters:
+		memory (bool): also trace peak memory with tracemalloc, which
+					slows the run down (see Profile)
+
+	Returns:
+		profile (Profile): use in a with statement, then call report(),
+					toJSON() or toPstats()
+
+	"""
+
+	return Profile(memory)
+
+#----------------------------------------------------------------------------#
@@ -0,0 +1,234 @@
+""" This module runs fits in worker processes without pickling the Mars
+	observations for every task. The observation arrays are published once
+	in shared memory, workers attach to them by name when they start, and
+	each task only sends back its small parameter vector.
+"""
+
+# Developed by Pulkit Singh, Niheshkumar Rathod & Rajesh Sundaresan
+# Copyright lies with the Robert Bosch Center for Cyber-Physical Systems,
+# Indian Institute of Science, Bangalore, India.
+
+#----------------------------------------------------------------------------#
+
+import weakref
+import numpy as np
+
+# shared memory and process pools are only available on Python 3.8+
+try:
+	from multiprocessing import shared_memory
+	from concurrent.futures import ProcessPoolExecutor
+except ImportError:
+	shared_memory = None
+	ProcessPoolExecutor = None
+
+from . import kernels
+from .fitPlane import planeGradientDescent
+from .fitOrbit import ellipseGradientDescent
+
+#----------------------------------------------------------------------------#
+
+def _releaseSegments(segments):
+	""" Closes and unlinks shared memory segments, ignoring the ones that
+		are already gone.
+	"""
+
+	for segment in segments:
+		try:
+			segment.close()
+			segment.unlink()
+		except (OSError, IOError):
+			pass
+	del segments[:]
+
+#----------------------------------------------------------------------------#
+
+class SharedArrays(object):
+	""" Copies a set of named arrays into shared memory segments, which
+		stay alive until close() is called (or the object is garbage
+		collected, or the interpreter exits).
+
+	Parameters:
+		arrays (dict): name -> array-like, e.g. the liftedLocations from
+					orbit.liftCoordinates or the coordinates from
+					plane.findCoordinates
+
+	Attributes:
+		specs (dict): name -> (segment name, shape, dtype), everything a
+					worker needs to attach to the arrays
+
+	"""
+
+	def __init__(self, arrays):
+		if shared_memory is None:
+			raise RuntimeError("shared memory needs Python 3.8 or later")
+
+		self.specs = {}
+		self._segments = []
+		self._finalizer = weakref.finalize(self, _releaseSegments,
+			self._segments)
+
+		try:
+			for name, values in arrays.items():
+				values = np.ascontiguousarray(values, dtype=np.float64)
+				segment = shared_memory.SharedMemory(create=True,
+					size=max(values.nbytes, 1))
+				self._segments.append(segment)
+
+				view = np.ndarray(values.shape, values.dtype, segment.buf)
+				view[...] = values
+				self.specs[name] = (segment.name, values.shape,
+					values.dtype.str)
+		except Exception:
+			self.close()
+			raise
+
+	def close(self):
+		""" Releases every shared memory segment. Safe to call twice. """
+		self._finalizer()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		self.close()
+
+#----------------------------------------------------------------------------#
+
+# arrays attached in this worker process, and the segments backing them
+_workerArrays = {}
+_workerSegments = []
+
+def attach(specs):
+	""" Attaches to arrays published by SharedArrays. The returned arrays
+		are read-only views of the shared segments, no data is copied.
+
+	Parameters:
+		specs (dict): SharedArrays.specs
+
+	Returns:
+		arrays (dict): name -> numpy array
+
+	"""
+
+	arrays = {}
+	for name, (segmentName, shape, dtype) in specs.items():
+		segment = shared_memory.SharedMemory(name=segmentName)
+		_workerSegments.append(segment)
+
+		view = np.ndarray(shape, np.dtype(dtype), segment.buf)
+		view.flags.writeable = False
+		arrays[name] = view
+	return arrays
+
+def _initWorker(specs, warmUp):
+	_workerArrays.update(attach(specs))
+	if warmUp:
+		kernels.warmUp()
+
+def _runTask(function, args):
+	return function(_workerArrays, *args)
+
+#----------------------------------------------------------------------------#
+
+class SharedExecutor(object):
+	""" Process pool whose workers see a set of shared observation arrays.
+
+		Tasks are functions called as function(arrays, *args) in a worker,
+		where arrays maps each name to its shared array. Tasks must be
+		defined at module level (so that they can be pickled) and should
+		return small results, such as fitted parameters.
+
+		with SharedExecutor({"lifted": liftedLocations}, 4) as executor:
+			futures = [executor.submit(fitEllipseTask, "lifted", rows)
+				for rows in resamples]
+
+	Parameters:
+		arrays (dict): name -> array-like of observations
+		maxWorkers (int): number of worker processes (default: cpu count)
+		warmUp (bool): compile the kernels when each worker starts
+
+	"""
+
+	def __init__(self, arrays, maxWorkers=None, warmUp=True):
+		self.shared = SharedArrays(arrays)
+		try:
+			self.pool = ProcessPoolExecutor(maxWorkers,
+				initializer=_initWorker, initargs=(self.shared.specs, warmUp))
+		except Exception:
+			self.shared.close()
+			raise
+
+	def submit(self, function, *args):
+		""" Schedules function(arrays, *args), returns a Future. """
+		return self.pool.submit(_runTask, function, args)
+
+	def map(self, function, *iterables):
+		""" Like the builtin map, with function(arrays, *args) running in
+			the workers. Results come back in order.
+		"""
+		futures = [self.submit(function, *args) for args in zip(*iterables)]
+		return [future.result() for future in futures]
+
+	def shutdown(self):
+		""" Waits for pending tasks, stops the workers and releases the
+			shared memory.
+		"""
+		try:
+			self.pool.shutdown(wait=True)
+		finally:
+			self.shared.close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		self.shutdown()
+
+#----------------------------------------------------------------------------#
+
+def fitPlaneTask(arrays, name, rows=None):
+	""" Task fitting the orbital plane to shared celestial sphere
+		coordinates, laid out as in plane.findCoordinates ([x, y, z]).
+
+	Parameters:
+		arrays (dict): shared arrays, passed in by the executor
+		name (str): name of the coordinates array
+		rows (int list): indices of the observations to use (all of them
+					by default), e.g. a bootstrap resample
+
+	Returns:
+		planeParameters (float array): coefficients (a, b) of the plane
+
+	"""
+
+	coordinates = arrays[name]
+	if rows is not None:
+		coordinates = coordinates[:, rows]
+
+	return np.array(planeGradientDescent.findPlaneCompiled(coordinates))
+
+def fitEllipseTask(arrays, name, rows=None):
+	""" Task fitting the elliptical orbit to shared lifted locations, laid
+		out as in orbit.liftCoordinates ([[x, y, z], ...]).
+
+	Parameters:
+		arrays (dict): shared arrays, passed in by the executor
+		name (str): name of the lifted locations array
+		rows (int list): indices of the observations to use (all of them
+					by default), e.g. a bootstrap resample
+
+	Returns:
+		ellipseParameters (float array): x-y coordinates of the second
+					focus, length of the major axis and the final loss
+
+	"""
+
+	liftedLocations = arrays[name]
+	if rows is not None:
+		liftedLocations = liftedLocations[rows]
+
+	xf, yf, axis, cost = ellipseGradientDescent.findEllipseCompiled(
+		liftedLocations[:, 0], liftedLocations[:, 1], 0.0, 0.0, 0.0)
+	return np.array([xf, yf, axis, cost[-1]])
+
+#----------------------------------------------------------------------------#
@@ -0,0 +1,164 @@
+""" This module models the orbit of Earth as an ellipse instead of the
+	unit circle, and computes the location of Earth on any date by solving
+	Kepler's equation. Locations are cached by date, so that every date is
+	only ever solved once.
+"""
+
+# Developed by Pulkit Singh, Niheshkumar Rathod & Rajesh Sundaresan
+# Copyright lies with the Robert Bosch Center for Cyber-Physical Systems,
+# Indian Institute of Science, Bangalore, India.
+
+#----------------------------------------------------------------------------#
+
+import collections
+import datetime
+import numpy as np
+
+from .. import kepler
+
+#----------------------------------------------------------------------------#
+
+# Orbital elements of Earth, from the low precision solar coordinates of
+# the Astronomical Almanac. Angles are in degrees, rates in degrees per day
+# and times in days from J2000 (noon, 1 January 2000).
+J2000 = datetime.date(2000, 1, 1).toordinal() + 0.5
+ECCENTRICITY = 0.016709
+MEAN_ANOMALY = 357.528
+MEAN_MOTION = 0.9856003
+PERIHELION = 102.937
+PERIHELION_RATE = 0.0000471
+
+#----------------------------------------------------------------------------#
+
+class EarthOrbit(object):
+	""" Elliptical orbit of Earth, with the sun at one focus.
+
+	Parameters:
+		eccentricity (float): eccentricity of the orbit
+		semiMajorAxis (float): semi-major axis of the orbit (in AU)
+		anomalyOffset (float): correction (in radians) added to the mean
+					anomaly, see calibrate()
+
+	"""
+
+	def __init__(self, eccentricity=ECCENTRICITY, semiMajorAxis=1.0,
+		anomalyOffset=0.0):
+		self.eccentricity = eccentricity
+		self.semiMajorAxis = semiMajorAxis
+		self.anomalyOffset = anomalyOffset
+		self._cache = {}     # ordinal day -> [xEarth, yEarth]
+
+	#------------------------------------------------------------------------#
+
+	def perihelion(self, days):
+		""" Longitude of the perihelion (in radians) at ordinal days. """
+
+		return np.radians(PERIHELION + PERIHELION_RATE * (np.asarray(days,
+			dtype=np.float64) - J2000))
+
+	def meanAnomaly(self, days):
+		""" Mean anomaly (in radians) at ordinal days. """
+
+		return (np.radians(MEAN_ANOMALY + MEAN_MOTION * (np.asarray(days,
+			dtype=np.float64) - J2000)) + self.anomalyOffset)
+
+	def calibrate(self, days, longitudes):
+		""" Sets anomalyOffset so that the orbit matches observed Earth
+			longitudes on average. This absorbs calendar differences (such
+			as Julian dates) and the zero point of the longitudes.
+
+		Parameters:
+			days (float list): ordinal days of the observations
+			longitudes (float list): observed heliocentric longitudes of
+						Earth (in radians)
+
+		"""
+
+		self.anomalyOffset = 0.0
+		observed = kepler.meanFromTrue(np.asarray(longitudes)
+			- self.perihelion(days), self.eccentricity)
+		self.anomalyOffset = kepler.circularMean(observed
+			- self.meanAnomaly(days))
+		self._cache.clear()
+
+	#------------------------------------------------------------------------#
+
+	def _solve(self, days):
+		# x-y coordinates of Earth at the given days
+		trueAnomaly = kepler.trueFromMean(kepler.wrapAngle(
+			self.meanAnomaly(days)), self.eccentricity)
+		distance = kepler.radius(trueAnomaly, self.semiMajorAxis,
+			self.eccentricity)
+		longitude = trueAnomaly + self.perihelion(days)
+		return np.column_stack([distance * np.cos(longitude),
+			distance * np.sin(longitude)])
+
+	def locations(self, days):
+		""" Computes the x-y coordinates of Earth at ordinal days. Dates
+			that were solved before are taken from the cache, the others
+			are solved together and added to it.
+
+		Parameters:
+			days (float list): ordinal days
+
+		Returns:
+			earthLocations (float array): n x 2 x-y coordinates (AU)
+
+		"""
+
+		days = [float(day) for day in days]
+		missing = sorted(set(day for day in days if day not in self._cache))
+		if missing:
+			for day, location in zip(missing, self._solve(missing)):
+				self._cache[day] = location
+
+		if not days:
+			return np.empty((0, 2))
+		return np.array([self._cache[day] for day in days])
+
+	def longitudes(self, days):
+		""" Computes heliocentric longitudes of Earth (in radians) at
+			ordinal days.
+		"""
+
+		earthLocations = self.locations(days)
+		return np.mod(np.arctan2(earthLocations[:, 1], earthLocations[:, 0]),
+			2 * np.pi)
+
+#----------------------------------------------------------------------------#
+
+# orbits calibrated on the most recent data files, by their observations
+_orbits = collections.OrderedDict()
+
+def calibratedOrbit(days, longitudes):
+	""" Returns an EarthOrbit calibrated on observed longitudes. Observations
+		that are all part of an earlier calibration (such as a resample of
+		the rows of a data file) reuse that orbit, so they get the same
+		calibration and share its cache of solved dates. Only the orbits of
+		the four most recent calibrations are kept.
+
+	Parameters:
+		days (float list): ordinal days of the observations
+		longitudes (float list): observed heliocentric longitudes of
+					Earth (in radians)
+
+	Returns:
+		orbit (EarthOrbit): calibrated Earth orbit
+
+	"""
+
+	observations = frozenset((float(day), float(longitude))
+		for day, longitude in zip(days, longitudes))
+	for key in reversed(_orbits):
+		if observations <= key:
+			_orbits.move_to_end(key)
+			return _orbits[key]
+
+	orbit = EarthOrbit()
+	orbit.calibrate(days, longitudes)
+	_orbits[observations] = orbit
+	while len(_orbits) > 4:
+		_orbits.popitem(last=False)
+	return orbit
+
+#----------------------------------------------------------------------------#
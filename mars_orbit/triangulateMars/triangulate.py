@@ -9,45 +9,84 @@
 
 # importing required modules
 import csv
+import datetime
 import math
+import numpy as np
 import matplotlib.pyplot as plt
 
+# compiled kernels, with a NumPy fallback when numba is missing
+from .. import kernels
+
+# importing custom module to compute the elliptical orbit of Earth
+from . import earthOrbit
+
 #----------------------------------------------------------------------------#
 
-def loadData():
+def loadData(tri="triangulation.csv", eccentricEarth=False):
 	""" Loads data contained in triangulation.csv, returns lists of Earth
 	    locations and Mars angles.
 
+	    By default Earth is placed on the unit circle at the given angles.
+	    With eccentricEarth, Earth is placed on its elliptical orbit at the
+	    date of each observation instead (see earthOrbit).
+
 	Parameters:
-		none
+		tri (str): path to the triangulation csv file
+		eccentricEarth (bool): use the elliptical Earth orbit
 
 	Returns:
 		earthLocations (float list): list of x-y coordinates of Earth
 		marsAngles (float list): list of angles to Mars from Earth locations
 
 	"""
-	tri = "triangulation.csv"
 	fields = []                # text headings in csv file
-	earthLocations = []        # Positions of Earth - [x, y] format (AU)
-	marsAngles = []            # Angles to Mars from Earth (radians)
+	rows = []                  # numeric columns of each row
 
 	# reading in triangulation csv file
 	with open(tri, 'r') as trifile:
 		triangulation = csv.reader(trifile)
-		fields = triangulation.next()    # discarding text headings
-
-		# creating list of Earth locations and Mars angles
+		fields = next(triangulation)    # discarding text headings
 		for row in triangulation:
+			rows.append([float(value) for value in row])
+	rows = np.array(rows).reshape(-1, len(fields))
+
+	# Positions of Earth - [x, y] format (AU)
+	earthAngles = kernels.sexagesimalToRadians(rows[:, 4], rows[:, 5])
+	if eccentricEarth:
+		days = [date.toordinal() for date in loadDates(tri)]
+		orbit = earthOrbit.calibratedOrbit(days, earthAngles)
+		earthLocations = orbit.locations(days).tolist()
+	else:
+		earthLocations = np.column_stack([np.cos(earthAngles),
+			np.sin(earthAngles)]).tolist()
+
+	# Angles to Mars from Earth (radians)
+	marsAngles = kernels.sexagesimalToRadians(rows[:, 6], rows[:, 7]).tolist()
 
-			earthAngle = math.radians(float(row[4]) + (float(row[5])/60))
-			xEarth = math.cos(earthAngle)
-			yEarth = math.sin(earthAngle)
-			earthLocations.append([xEarth, yEarth])
+	return earthLocations, marsAngles
 
-			marsAngle = math.radians(float(row[6]) + (float(row[7])/60))
-			marsAngles.append(marsAngle)
+#----------------------------------------------------------------------------#
 
-	return earthLocations, marsAngles
+def loadDates(tri="triangulation.csv"):
+	""" Loads the dates of the observations contained in triangulation.csv.
+
+	Parameters:
+		tri (str): path to the triangulation csv file
+
+	Returns:
+		dates (date list): list of observation dates
+
+	"""
+	dates = []
+
+	# reading in triangulation csv file (Day, Month, Year columns)
+	with open(tri, 'r') as trifile:
+		triangulation = csv.reader(trifile)
+		fields = next(triangulation)
+		for row in triangulation:
+			dates.append(datetime.date(int(row[3]), int(row[2]), int(row[1])))
+
+	return dates
 
 #----------------------------------------------------------------------------#
 
@@ -0,0 +1,56 @@
+""" Tests of mars_orbit.triangulateMars.earthOrbit, mainly that the
+	eccentric Earth positions are stable when the observations are
+	resampled.
+"""
+
+# Developed by Pulkit Singh, Niheshkumar Rathod & Rajesh Sundaresan
+# Copyright lies with the Robert Bosch Center for Cyber-Physical Systems,
+# Indian Institute of Science, Bangalore, India.
+
+#----------------------------------------------------------------------------#
+
+import os
+import numpy as np
+
+from mars_orbit import kernels
+from mars_orbit.triangulateMars import earthOrbit, triangulate
+
+TRIANGULATION = os.path.join(os.path.dirname(os.path.dirname(
+	os.path.abspath(__file__))), "triangulation.csv")
+
+#----------------------------------------------------------------------------#
+
+def observations():
+	days = [date.toordinal() for date in triangulate.loadDates(TRIANGULATION)]
+	rows = np.loadtxt(TRIANGULATION, delimiter=",", skiprows=1, ndmin=2)
+	longitudes = kernels.sexagesimalToRadians(rows[:, 4], rows[:, 5])
+	return np.array(days), longitudes
+
+def test_resamplesReuseTheFileCalibration():
+	earthOrbit._orbits.clear()
+	days, longitudes = observations()
+	earthLocations, _ = triangulate.loadData(TRIANGULATION, True)
+	orbit = earthOrbit.calibratedOrbit(days, longitudes)
+	solved = len(orbit._cache)
+
+	rows = np.random.RandomState(0).choice(len(days), len(days))
+	for subset in (np.arange(6), rows):
+		resampled = earthOrbit.calibratedOrbit(days[subset],
+			longitudes[subset])
+		assert resampled is orbit
+		assert np.array_equal(resampled.locations(days[subset]),
+			np.array(earthLocations)[subset])
+
+	# the resamples only looked up dates that were already solved
+	assert len(orbit._cache) == solved
+	assert len(earthOrbit._orbits) == 1
+
+def test_newObservationsAreCalibratedSeparately():
+	earthOrbit._orbits.clear()
+	days, longitudes = observations()
+	orbit = earthOrbit.calibratedOrbit(days, longitudes)
+	shifted = earthOrbit.calibratedOrbit(days[:6], longitudes[:6] + 0.01)
+	assert shifted is not orbit
+	assert earthOrbit.calibratedOrbit(days[:3], longitudes[:3]) is orbit
+
+#----------------------------------------------------------------------------#
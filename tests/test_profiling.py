@@ -0,0 +1,52 @@
+""" Tests of mars_orbit.profiling. """
+
+# Developed by Pulkit Singh, Niheshkumar Rathod & Rajesh Sundaresan
+# Copyright lies with the Robert Bosch Center for Cyber-Physical Systems,
+# Indian Institute of Science, Bangalore, India.
+
+#----------------------------------------------------------------------------#
+
+import mars_orbit
+from mars_orbit import profiling
+
+#----------------------------------------------------------------------------#
+
+def test_packageNamesArePatchedModules():
+	# the names exported by the package must be the modules profiling wraps
+	assert mars_orbit.triangulate in profiling.MODULES
+	assert mars_orbit.plane in profiling.MODULES
+	assert mars_orbit.orbit in profiling.MODULES
+
+def test_callsThroughPackageNamesAreRecorded():
+	marsLocations = [[1.5, 0.0], [0.0, 1.6], [-1.4, 0.2]]
+	liftedLocations = [[1.5, 0.0, 0.0], [0.0, 1.6, 0.0], [-1.4, 0.2, 0.0]]
+
+	with mars_orbit.profile() as p:
+		mars_orbit.triangulate.computeRadius(marsLocations)
+		mars_orbit.orbit.fitCircle(liftedLocations)
+		mars_orbit.orbit.fitCircle(liftedLocations)
+
+	assert p.stats["triangulate.computeRadius"]["calls"] == 1
+	assert p.stats["orbit.fitCircle"]["calls"] == 2
+	assert p.stats["orbit.fitCircle"]["peakBytes"] is None
+
+def test_functionsAreRestored():
+	fitCircle = mars_orbit.orbit.fitCircle
+	with mars_orbit.profile():
+		assert mars_orbit.orbit.fitCircle is not fitCircle
+	assert mars_orbit.orbit.fitCircle is fitCircle
+
+def test_addPeakBytes():
+	liftedLocations = [[1.5, 0.0, 0.0], [0.0, 1.6, 0.0]]
+	with mars_orbit.profile() as timed:
+		mars_orbit.orbit.fitCircle(liftedLocations)
+	with mars_orbit.profile(memory=True) as traced:
+		mars_orbit.orbit.fitCircle(liftedLocations)
+
+	timed.addPeakBytes(traced)
+	stat = timed.stats["orbit.fitCircle"]
+	assert stat["calls"] == 1
+	if profiling.HAVE_TRACEMALLOC:
+		assert stat["peakBytes"] >= 0
+
+#----------------------------------------------------------------------------#
@@ -0,0 +1,87 @@
+""" Tests of mars_orbit.sharedExecutor, mainly that shared memory segments
+	are always released.
+"""
+
+# Developed by Pulkit Singh, Niheshkumar Rathod & Rajesh Sundaresan
+# Copyright lies with the Robert Bosch Center for Cyber-Physical Systems,
+# Indian Institute of Science, Bangalore, India.
+
+#----------------------------------------------------------------------------#
+
+import gc
+import numpy as np
+import pytest
+
+from mars_orbit import sharedExecutor
+from mars_orbit.fitPlane import plane, planeGradientDescent
+from mars_orbit.fitOrbit import ellipseGradientDescent
+
+pytestmark = pytest.mark.skipif(sharedExecutor.shared_memory is None,
+	reason="shared memory needs Python 3.8 or later")
+
+#----------------------------------------------------------------------------#
+
+def observations():
+	angles = np.linspace(0, 2 * np.pi, 12, endpoint=False)
+	coordinates = plane.findCoordinates(angles.tolist(),
+		(0.02 * np.sin(angles)).tolist())
+	liftedLocations = np.column_stack([1.5 * np.cos(angles) - 0.1,
+		1.4 * np.sin(angles), np.zeros(12)])
+	return {"coordinates": coordinates, "lifted": liftedLocations}
+
+def isUnlinked(segmentName):
+	try:
+		segment = sharedExecutor.shared_memory.SharedMemory(name=segmentName)
+	except FileNotFoundError:
+		return True
+	segment.close()
+	return False
+
+def segmentNames(executor):
+	return [spec[0] for spec in executor.shared.specs.values()]
+
+#----------------------------------------------------------------------------#
+
+def test_tasksMatchTheCompiledFits():
+	arrays = observations()
+	rows = [0, 2, 4, 6, 8, 10]
+	with sharedExecutor.SharedExecutor(arrays, 2, warmUp=False) as executor:
+		names = segmentNames(executor)
+		planes = executor.map(sharedExecutor.fitPlaneTask,
+			["coordinates", "coordinates"], [None, rows])
+		ellipse = executor.submit(sharedExecutor.fitEllipseTask,
+			"lifted").result()
+
+	assert np.allclose(planes[0], planeGradientDescent.findPlaneCompiled(
+		arrays["coordinates"]))
+	assert np.allclose(planes[1], planeGradientDescent.findPlaneCompiled(
+		np.asarray(arrays["coordinates"])[:, rows]))
+	xf, yf, axis, cost = ellipseGradientDescent.findEllipseCompiled(
+		arrays["lifted"][:, 0], arrays["lifted"][:, 1], 0.0, 0.0, 0.0)
+	assert np.allclose(ellipse, [xf, yf, axis, cost[-1]])
+	assert all(isUnlinked(name) for name in names)
+
+def test_segmentsAreUnlinkedWhenATaskRaises():
+	with pytest.raises(KeyError):
+		with sharedExecutor.SharedExecutor(observations(), 2,
+			warmUp=False) as executor:
+			names = segmentNames(executor)
+			executor.submit(sharedExecutor.fitPlaneTask, "missing").result()
+	assert all(isUnlinked(name) for name in names)
+
+def test_sharedArraysAreReleased():
+	shared = sharedExecutor.SharedArrays(observations())
+	names = [spec[0] for spec in shared.specs.values()]
+	assert not any(isUnlinked(name) for name in names)
+	shared.close()
+	shared.close()
+	assert all(isUnlinked(name) for name in names)
+
+	# without close(), when the arrays are garbage collected
+	shared = sharedExecutor.SharedArrays(observations())
+	names = [spec[0] for spec in shared.specs.values()]
+	del shared
+	gc.collect()
+	assert all(isUnlinked(name) for name in names)
+
+#----------------------------------------------------------------------------#